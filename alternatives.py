@@ -0,0 +1,153 @@
+import data_layer
+import ddi_bitset
+import ddi_rules
+from ddi_index import SEVERITY_LEVELS, normalize, severity_rank
+
+# ------------------ SAFER ALTERNATIVES ------------------
+# Replacement suggestions for a drug involved in a serious interaction:
+# other drugs of the same therapeutic class (drug_classes.json) that have
+# no serious or contraindicated interaction with the rest of the regimen.
+#
+# Class membership is precomputed as bitsets over the same drug numbering
+# as ddi_bitset, so a suggestion is a handful of ORs / ANDs: class members,
+# minus the regimen, minus everything the other regimen drugs interact
+# with seriously. Survivors are ranked by their worst remaining severity;
+# candidates with no data for some pair with the regimen (unchecked) come
+# after every fully checked one, since "no data" is not "no interaction".
+#
+# Stores without bitsets (SQLite, mapped index; see ddi_bitset.in_memory)
+# get LookupAlternatives instead: the same answer from point lookups of
+# each class member against the rest of the regimen.
+
+# Candidates interacting at this rank or above are never suggested
+SERIOUS_RANK = SEVERITY_LEVELS["serious - use alternative"]
+
+
+class AlternativeIndex:
+    """Class-member bitsets plus per-drug "serious or worse" adjacency."""
+
+    __slots__ = ("bitsets", "classes", "members", "serious")
+
+    def __init__(self, bitsets, rules):
+        self.bitsets = bitsets
+        ids = bitsets.ids
+        members = {}
+        classes = {}
+        for drug, drug_classes in rules.classes.items():
+            i = ids.get(drug)
+            if i is None:
+                # Not in this store (e.g. outside a tenant formulary)
+                continue
+            classes[i] = tuple(sorted(drug_classes))
+            for class_name in drug_classes:
+                members[class_name] = members.get(class_name, 0) | 1 << i
+        self.classes = classes
+        self.members = members
+
+        serious = [0] * len(bitsets.drugs)
+        for rank in ddi_bitset.TIERS:
+            if rank >= SERIOUS_RANK:
+                tier = bitsets.adjacency[rank]
+                for i, row in enumerate(tier):
+                    serious[i] |= row
+        self.serious = serious
+
+    def suggest(self, drug, regimen, k=5):
+        """
+        Up to k replacements for drug given the rest of the regimen, as
+        [(candidate, class name, worst severity rank, unchecked)], safest
+        first. unchecked counts regimen drugs without data for the candidate.
+        """
+        bitsets = self.bitsets
+        x = bitsets.ids.get(normalize(drug))
+        if x is None or x not in self.classes:
+            return []
+        others = {i for i in bitsets.regimen_ids(regimen) if i != x}
+        in_regimen = 1 << x
+        blocked = 0
+        for i in others:
+            in_regimen |= 1 << i
+            blocked |= self.serious[i]
+
+        candidates = 0
+        for class_name in self.classes[x]:
+            candidates |= self.members[class_name]
+        candidates &= ~(in_regimen | blocked)
+
+        # Remaining (non-serious) tiers touched by the other drugs
+        touched = []
+        for rank in ddi_bitset.TIERS:
+            if rank < SERIOUS_RANK:
+                mask = 0
+                for i in others:
+                    mask |= bitsets.adjacency[rank][i]
+                touched.append((rank, mask))
+
+        found = []
+        while candidates:
+            low = candidates & -candidates
+            c = low.bit_length() - 1
+            candidates ^= low
+            worst = next((rank for rank, mask in touched if mask & low), 0)
+            unchecked = sum(1 for i in others if not bitsets.known[i] & low)
+            shared = next(name for name in self.classes[c] if name in self.classes[x])
+            found.append((unchecked > 0, worst, bitsets.drugs[c], shared, unchecked))
+        found.sort()
+        return [(candidate, class_name, worst, unchecked) for _, worst, candidate, class_name, unchecked in found[:k]]
+
+
+class LookupAlternatives:
+    """AlternativeIndex.suggest() via store.get() for stores without bitsets."""
+
+    __slots__ = ("store", "classes", "members")
+
+    def __init__(self, store, rules):
+        self.store = store
+        members = {}
+        classes = {}
+        for drug, drug_classes in rules.classes.items():
+            if drug not in store:
+                continue
+            classes[drug] = tuple(sorted(drug_classes))
+            for class_name in drug_classes:
+                members.setdefault(class_name, set()).add(drug)
+        self.classes = classes
+        self.members = members
+
+    def suggest(self, drug, regimen, k=5):
+        """Same result as AlternativeIndex.suggest()."""
+        x = normalize(drug)
+        if x not in self.classes:
+            return []
+        regimen = {normalize(d) for d in regimen if d in self.store}
+        others = regimen - {x}
+        candidates = set()
+        for class_name in self.classes[x]:
+            candidates |= self.members[class_name]
+        candidates -= regimen | {x}
+
+        found = []
+        for c in candidates:
+            worst = 0
+            unchecked = 0
+            for other in others:
+                interaction = self.store.get(c, other)
+                if interaction is None:
+                    unchecked += 1
+                else:
+                    worst = max(worst, severity_rank(interaction["severity"]))
+            if worst >= SERIOUS_RANK:
+                continue
+            shared = next(name for name in self.classes[c] if name in self.classes[x])
+            found.append((unchecked > 0, worst, c, shared, unchecked))
+        found.sort()
+        return [(candidate, class_name, worst, unchecked) for _, worst, candidate, class_name, unchecked in found[:k]]
+
+
+def get_alternatives(store):
+    """Alternative index for a store plus drug_classes.json, cached per version."""
+    bitsets = ddi_bitset.get_bitsets(store)
+    rules = data_layer.load(ddi_rules.CLASSES_FILE, ddi_rules.load_rules)
+    if bitsets is None:
+        return data_layer.derived(("alternatives", id(store)), LookupAlternatives, store, rules)
+    return data_layer.derived(("alternatives", id(store)), AlternativeIndex, bitsets, rules)
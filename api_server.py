@@ -0,0 +1,353 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+import calculators
+import ddi_check
+import ddi_overlay
+import drug_aliases
+import drug_search
+import regimen
+
+# ------------------ HTTP API ------------------
+# Machine-to-machine JSON API over the same shared indexes as the UI
+# (data_layer caches: interaction store, aliases, search index, report
+# cache), served by a small asyncio HTTP/1.1 server with keep-alive:
+#
+#     python api_server.py --host 127.0.0.1 --port 8502
+#
+#   GET  /health
+#   GET  /search?q=<text>&k=20              drug search (names and brands)
+#   POST /check        {"drugs": [...], "patient": {...}}
+#   POST /check/batch  NDJSON, one check request per line (optional "id");
+#                      the response streams one NDJSON result per line
+#   GET  /calculators                       calculator catalog with input,
+#                                           output and band declarations
+#   POST /calculate    {"name": ..., "inputs": {...}}   (dates as YYYY-MM-DD)
+#
+# A hospital overlay is selected with ?site=<tenant> (as in the UI) or
+# DDI_TENANT. Patient fields: egfr, pregnant, hepatic_impairment.
+#
+# Each connection is one coroutine; checks are microseconds of CPU, so they
+# run inline on the event loop. Batch bodies are read and answered line by
+# line, never held whole in memory.
+
+MAX_BODY = 1 << 20           # single-request bodies
+MAX_LINE = 1 << 16           # request line, headers and NDJSON lines
+MAX_HEADERS = 100
+IDLE_TIMEOUT = 60.0          # seconds a keep-alive connection may sit idle
+BATCH_DRAIN_EVERY = 256      # NDJSON lines written between flow-control waits
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    __slots__ = ("method", "path", "query", "headers", "reader", "length")
+
+    def __init__(self, method, target, headers, reader):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path.rstrip("/") or "/"
+        self.query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        self.headers = headers
+        self.reader = reader
+        length = headers.get("content-length", "").strip() or "0"
+        if not (length.isascii() and length.isdigit()):
+            raise HTTPError(400, f"invalid Content-Length: {length!r}")
+        self.length = int(length)
+
+    @property
+    def chunked(self):
+        return "chunked" in self.headers.get("transfer-encoding", "").lower()
+
+    def require_length(self):
+        if self.chunked:
+            raise HTTPError(411, "chunked request bodies are not supported; send Content-Length")
+
+    async def json(self):
+        self.require_length()
+        if self.length > MAX_BODY:
+            raise HTTPError(413, f"body larger than {MAX_BODY} bytes; use a /batch endpoint")
+        body = await self.reader.readexactly(self.length)
+        self.length = 0
+        try:
+            return json.loads(body or b"{}")
+        except ValueError as exc:
+            raise HTTPError(400, f"invalid JSON: {exc}")
+
+    async def lines(self):
+        """Body lines, read incrementally and never past Content-Length (for NDJSON batches)."""
+        self.require_length()
+        buffer = b""
+        while self.length > 0:
+            chunk = await self.reader.read(min(self.length, 1 << 16))
+            if not chunk:
+                break
+            self.length -= len(chunk)
+            *lines, buffer = (buffer + chunk).split(b"\n")
+            for line in lines:
+                if len(line) > MAX_LINE:
+                    raise HTTPError(413, f"NDJSON line longer than {MAX_LINE} bytes")
+                if line.strip():
+                    yield line
+            if len(buffer) > MAX_LINE:
+                raise HTTPError(413, f"NDJSON line longer than {MAX_LINE} bytes")
+        if buffer.strip():
+            yield buffer
+
+    async def discard(self):
+        """Skip an unread body so the next request on the connection parses."""
+        while self.length > 0:
+            chunk = await self.reader.read(min(self.length, 1 << 16))
+            if not chunk:
+                break
+            self.length -= len(chunk)
+
+
+# ------------------ HANDLERS ------------------
+
+def _store(request):
+    return ddi_overlay.get_store(request.query.get("site") or os.environ.get("DDI_TENANT"))
+
+
+def _patient(data):
+    data = data or {}
+    if not isinstance(data, dict):
+        raise HTTPError(400, "patient must be an object")
+    egfr = data.get("egfr")
+    if egfr is not None and not isinstance(egfr, (int, float)):
+        raise HTTPError(400, "patient.egfr must be a number")
+    return regimen.Patient(egfr, bool(data.get("pregnant")), bool(data.get("hepatic_impairment")))
+
+
+def _check(store, payload):
+    if not isinstance(payload, dict) or not isinstance(payload.get("drugs"), list):
+        raise HTTPError(400, 'expected {"drugs": [...]}')
+    names = [str(name) for name in payload["drugs"]]
+    aliases = drug_aliases.get_alias_index(store)
+    report, unknown = ddi_check.check(
+        names, store, aliases, regimen.get_attributes(), _patient(payload.get("patient")),
+        regimen.get_report_cache(store),
+    )
+    return ddi_check.to_json(report, unknown)
+
+
+async def health(request, respond):
+    store = _store(request)
+    await respond(200, {"status": "ok", "drugs": len(store.drugs), "report_cache": regimen.get_report_cache(store).stats()})
+
+
+async def search(request, respond):
+    query = request.query.get("q", "")
+    try:
+        k = max(1, min(int(request.query.get("k", 20)), 100))
+    except ValueError:
+        raise HTTPError(400, "k must be an integer")
+    matches = drug_search.get_search_index(_store(request)).search(query, k)
+    await respond(200, {"query": query, "results": [{"drug": drug, "label": label} for drug, label in matches]})
+
+
+async def check(request, respond):
+    await respond(200, _check(_store(request), await request.json()))
+
+
+async def check_batch(request, respond):
+    store = _store(request)
+    # Before the 200 goes out: a chunked body cannot be streamed
+    request.require_length()
+
+    async def results():
+        try:
+            async for line in request.lines():
+                try:
+                    payload = json.loads(line)
+                    result = _check(store, payload)
+                    if isinstance(payload, dict) and "id" in payload:
+                        result = dict(id=payload["id"], **result)
+                except (ValueError, HTTPError) as exc:
+                    result = {"error": getattr(exc, "message", str(exc))}
+                except Exception as exc:
+                    # One bad line must not cut off the rest of the stream
+                    result = {"error": f"internal error: {type(exc).__name__}"}
+                yield result
+        except HTTPError as exc:
+            # Oversized line: report it and end the stream (the rest is discarded)
+            yield {"error": exc.message}
+
+    await respond(200, results())
+
+
+def _jsonable(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+async def calculator_catalog(request, respond):
+    await respond(200, {
+        "categories": calculators.CALCULATORS_BY_CATEGORY,
+        "calculators": [calculators.CALCULATORS[name].describe() for name in calculators.ALL_CALCULATORS],
+    })
+
+
+async def calculate(request, respond):
+    payload = await request.json()
+    if (not isinstance(payload, dict) or not isinstance(payload.get("name"), str)
+            or not isinstance(payload.get("inputs", {}), dict)):
+        raise HTTPError(400, 'expected {"name": ..., "inputs": {...}}')
+    name = payload["name"]
+    try:
+        results, bands = calculators.calculate(name, payload.get("inputs", {}))
+    except KeyError:
+        raise HTTPError(404, f"no calculator named {name!r}")
+    except ValueError as exc:
+        raise HTTPError(400, str(exc))
+    await respond(200, {
+        "name": name,
+        "results": {key: _jsonable(value) for key, value in results.items()},
+        "interpretation": [
+            {"output": output.name, "level": band.level, "label": band.label} for output, band in bands
+        ],
+    })
+
+
+ROUTES = {
+    ("GET", "/health"): health,
+    ("GET", "/search"): search,
+    ("POST", "/check"): check,
+    ("POST", "/check/batch"): check_batch,
+    ("GET", "/calculators"): calculator_catalog,
+    ("POST", "/calculate"): calculate,
+}
+PATHS = {path for _, path in ROUTES}
+
+
+# ------------------ HTTP/1.1 SERVER ------------------
+
+def _head(status, headers):
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    lines += [f"{name}: {value}" for name, value in headers]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _read_request(reader):
+    line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+    if not line:
+        return None, None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise HTTPError(400, "too many headers")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return Request(method.upper(), target, headers, reader), version
+
+
+async def handle_connection(reader, writer):
+    try:
+        while True:
+            try:
+                request, version = await _read_request(reader)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, asyncio.LimitOverrunError, ValueError):
+                break
+            except HTTPError as exc:
+                body = json.dumps({"error": exc.message}).encode()
+                writer.write(_head(exc.status, [("Content-Type", "application/json"), ("Content-Length", len(body)), ("Connection", "close")]) + body)
+                break
+            if request is None:
+                break
+            connection = request.headers.get("connection", "").lower()
+            keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+            if request.chunked:
+                # The body's end is unknown, so the connection cannot be reused
+                keep_alive = False
+            sent = False
+
+            async def respond(status, body):
+                nonlocal sent
+                sent = True
+                conn = [("Connection", "keep-alive" if keep_alive else "close")]
+                if isinstance(body, dict):
+                    data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                    writer.write(_head(status, [("Content-Type", "application/json"), ("Content-Length", len(data))] + conn) + data)
+                    return
+                # NDJSON stream, chunked
+                writer.write(_head(status, [("Content-Type", "application/x-ndjson"), ("Transfer-Encoding", "chunked")] + conn))
+                n = 0
+                async for item in body:
+                    data = json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n"
+                    writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                    n += 1
+                    if n % BATCH_DRAIN_EVERY == 0:
+                        await writer.drain()
+                writer.write(b"0\r\n\r\n")
+
+            handler = ROUTES.get((request.method, request.path))
+            try:
+                if handler is None:
+                    status = 405 if request.path in PATHS else 404
+                    raise HTTPError(status, f"no route for {request.method} {request.path}")
+                await handler(request, respond)
+            except HTTPError as exc:
+                if sent:
+                    break
+                await respond(exc.status, {"error": exc.message})
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            except Exception as exc:
+                print(f"{request.method} {request.path}: {type(exc).__name__}: {exc}", file=sys.stderr)
+                if sent:
+                    break
+                keep_alive = False
+                await respond(500, {"error": "internal server error"})
+            await writer.drain()
+            await request.discard()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+
+async def serve(host, port):
+    server = await asyncio.start_server(handle_connection, host, port, limit=MAX_LINE, backlog=2048)
+    # Build the shared indexes before the first request
+    store = ddi_overlay.get_store(os.environ.get("DDI_TENANT"))
+    drug_search.get_search_index(store)
+    addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"Serving on {addresses}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON HTTP API for interaction checks, drug search and calculators.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
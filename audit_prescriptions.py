@@ -0,0 +1,234 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import ddi_bitset
+import ddi_overlay
+import drug_aliases
+from compile_ddi import MAX_REPORTED, MalformedLines, json_rows, line_batches
+from ddi_index import SEVERITY_LEVELS, severity_rank
+
+# ------------------ PRESCRIPTION AUDIT ------------------
+# Headless batch check of every active prescription against the same
+# interaction data the Drug Assistant uses (DDI_BACKEND / tenant overlay):
+#
+#     python audit_prescriptions.py prescriptions.jsonl --out flagged.jsonl \
+#         --min-severity "serious - use alternative"
+#
+# Input is JSONL ({"id": ..., "drugs": [...]}) or CSV with an id column and
+# a drugs column separated by --drug-sep. Drug names may be brands or salts;
+# they are resolved through drug_aliases. Only prescriptions with at least
+# one interaction at --min-severity or worse are written, one JSON line each,
+# in input order.
+#
+# The input is streamed in line batches to a process pool with a bounded
+# number of batches in flight, so memory does not depend on input size.
+# The store, alias index and severity bitsets are built in the parent
+# before the pool starts; forked workers share them copy-on-write (with
+# DDI_BACKEND=mmap the index pages are shared by the OS as well). With
+# DDI_BACKEND=sqlite only the drug list is shared: each worker opens its
+# own database connection on first use (see ddi_sqlite). Each
+# prescription is screened with the bitsets and only flagged ones fetch
+# their interaction records. Backends without bitsets (SQLite, mmap; see
+# ddi_bitset.in_memory) fetch each prescription's records directly.
+#
+# Malformed JSONL lines (not a JSON object, or drugs not a list of names)
+# are skipped and counted; the first few are printed with their line number.
+
+DEFAULT_COLUMNS = {"id": "id", "drugs": "drugs"}
+
+_store = None
+_aliases = None
+_bitsets = None
+_options = None
+
+
+def _load(tenant):
+    store = ddi_overlay.get_store(tenant)
+    return store, drug_aliases.get_alias_index(store), ddi_bitset.get_bitsets(store)
+
+
+def _init_worker(tenant, options):
+    global _store, _aliases, _bitsets, _options
+    # Inherited from the parent when forked; built here otherwise
+    _store, _aliases, _bitsets = _load(tenant)
+    _options = options
+
+
+def audit_prescription(drugs, store, aliases, bitsets, min_rank):
+    """
+    (worst rank, [(pair, record)] at min_rank or worse, unknown names) for
+    one drug list. With bitsets, records are only fetched when they flag the list.
+    """
+    names = []
+    unknown = []
+    for drug in drugs:
+        name = aliases.resolve(drug)
+        if name in store:
+            if name not in names:
+                names.append(name)
+        elif drug.strip():
+            unknown.append(drug.strip())
+    records = None
+    if bitsets is not None:
+        worst = bitsets.max_severity(names)
+    else:
+        records = store.interactions_among(names)
+        worst = max((severity_rank(record["severity"]) for record in records.values()), default=0)
+    if worst < min_rank:
+        return worst, [], unknown
+    if records is None:
+        records = store.interactions_among(names)
+    found = [
+        (pair, record)
+        for pair, record in records.items()
+        if severity_rank(record["severity"]) >= min_rank
+    ]
+    found.sort(key=lambda item: (-severity_rank(item[1]["severity"]), item[0]))
+    return worst, found, unknown
+
+
+def _audit_batch(fmt, header, lines):
+    """
+    Audit a batch of raw lines; returns (rows read, flagged JSON lines,
+    malformed count, first malformed (index, line)s).
+    """
+    columns = _options["columns"]
+    malformed = []
+    if fmt == "csv":
+        rows = enumerate(csv.DictReader(lines, fieldnames=header))
+    else:
+        rows = json_rows(lines, malformed)
+    flagged = []
+    seen = 0
+    for i, row in rows:
+        drugs = row.get(columns["drugs"]) or []
+        if isinstance(drugs, str):
+            drugs = drugs.split(_options["drug_sep"])
+        if not isinstance(drugs, list) or not all(isinstance(drug, str) for drug in drugs):
+            malformed.append((i, lines[i]))
+            continue
+        seen += 1
+        worst, found, unknown = audit_prescription(drugs, _store, _aliases, _bitsets, _options["min_rank"])
+        if not found:
+            continue
+        flagged.append(json.dumps({
+            "id": row.get(columns["id"]),
+            "worst_severity": ddi_bitset.TIER_NAMES[worst],
+            "interactions": [
+                {
+                    "drugs": list(pair),
+                    "severity": record["severity"],
+                    "type": record.get("type"),
+                    "description": record.get("description"),
+                }
+                for pair, record in found
+            ],
+            "unknown_drugs": unknown,
+        }, ensure_ascii=False))
+    return seen, flagged, len(malformed), malformed[:MAX_REPORTED]
+
+
+def stream_audit(source, out, tenant=None, min_severity="serious - use alternative", columns=None,
+                 drug_sep=";", workers=None, batch_lines=5000, progress=None, warn=None):
+    """
+    Audit a CSV/JSONL source across a process pool, writing flagged
+    prescriptions to the text stream out in input order.
+
+    Returns (rows read, rows flagged, malformed lines skipped). progress,
+    if given, is called with the running row count after every batch;
+    warn with the first few malformed lines.
+    """
+    fmt = "jsonl" if source.endswith((".jsonl", ".ndjson")) else "csv"
+    options = {
+        "columns": dict(DEFAULT_COLUMNS, **(columns or {})),
+        "drug_sep": drug_sep,
+        "min_rank": severity_rank(min_severity),
+    }
+    workers = workers or os.cpu_count() or 1
+    # Build everything once in the parent so forked workers inherit it
+    _load(tenant)
+    rows_read = 0
+    rows_flagged = 0
+    malformed = MalformedLines(fmt, warn)
+    offset = 0
+
+    def write(batch_offset, result):
+        nonlocal rows_read, rows_flagged
+        seen, flagged, skipped, samples = result
+        rows_read += seen
+        rows_flagged += len(flagged)
+        for line in flagged:
+            out.write(line + "\n")
+        malformed.add(batch_offset, skipped, samples)
+        if progress:
+            progress(rows_read)
+
+    with open(source, "r", encoding="utf-8", newline="") as f:
+        header = next(csv.reader([f.readline()])) if fmt == "csv" else None
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(tenant, options)) as pool:
+            # Written in input order, with at most two batches per worker in flight
+            pending = deque()
+            for batch in line_batches(f, fmt, batch_lines):
+                pending.append((offset, pool.submit(_audit_batch, fmt, header, batch)))
+                offset += len(batch)
+                if len(pending) >= 2 * workers:
+                    batch_offset, future = pending.popleft()
+                    write(batch_offset, future.result())
+            while pending:
+                batch_offset, future = pending.popleft()
+                write(batch_offset, future.result())
+    return rows_read, rows_flagged, malformed.count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit prescriptions for drug-drug interactions.")
+    parser.add_argument("source", help="JSONL ({\"id\", \"drugs\": [...]}) or CSV (with header) prescriptions")
+    parser.add_argument("--out", help="flagged prescriptions as JSONL (default: stdout)")
+    parser.add_argument("--tenant", default=os.environ.get("DDI_TENANT"), help="hospital overlay to apply")
+    parser.add_argument("--min-severity", default="serious - use alternative",
+                        choices=[s for s, rank in SEVERITY_LEVELS.items() if rank > 0],
+                        help="lowest severity that flags a prescription")
+    parser.add_argument("--drug-sep", default=";", help="separator inside the CSV drugs column")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--batch-lines", type=int, default=5000)
+    for field, default in DEFAULT_COLUMNS.items():
+        parser.add_argument(f"--col-{field}", dest=f"col_{field}", default=default,
+                            help=f"source column for {field} (default: {default})")
+    args = parser.parse_args(argv)
+
+    columns = {field: getattr(args, f"col_{field}") for field in DEFAULT_COLUMNS}
+    start = time.perf_counter()
+
+    def progress(rows):
+        elapsed = time.perf_counter() - start
+        print(f"\r{rows:,} prescriptions ({rows / max(elapsed, 1e-9):,.0f}/s)", end="", file=sys.stderr)
+
+    def warn(message):
+        print(f"\nwarning: {message}", file=sys.stderr)
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    try:
+        rows_read, rows_flagged, skipped = stream_audit(
+            args.source, out, args.tenant, args.min_severity, columns,
+            args.drug_sep, args.workers, args.batch_lines, progress, warn,
+        )
+    finally:
+        if args.out:
+            out.close()
+    print(file=sys.stderr)
+    if skipped:
+        print(f"{skipped:,} malformed lines skipped", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    print(f"{rows_read:,} prescriptions, {rows_flagged:,} flagged in {elapsed:.1f}s "
+          f"({rows_read / max(elapsed, 1e-9):,.0f} prescriptions/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
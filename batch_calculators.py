@@ -0,0 +1,315 @@
+import math
+
+import numpy as np
+
+import calculators
+
+# ------------------ BATCH CALCULATORS ------------------
+# Column-at-a-time versions of the registry calculators, for scoring whole
+# cohorts:
+#
+#     batch_calculators.egfr_ckd_epi(creatinine, age, sex)      # arrays in, array out
+#     batch_calculators.score("MELD", {"bilirubin": b, "inr": i, "creatinine": c})
+#
+# Inputs are checked against the same declarations as the Calculator page
+# (calculators.CALCULATORS). A blank, non-numeric, out-of-bounds or unknown
+# choice value makes that row NaN instead of raising, and so does a row the
+# formula cannot evaluate (division by zero, log of zero).
+#
+# Valid rows are bit-identical to the scalar functions. Arithmetic is done
+# by NumPy in the scalar operation order; pow/log go through the same libm
+# calls as the scalar code (NumPy's SIMD versions can differ in the last
+# bit), evaluated once per distinct value, which clinical columns (ages,
+# lab values with one or two decimals) have few of.
+#
+# Calculators without a vectorized kernel are scored row by row through the
+# scalar function, with the same NaN convention.
+
+
+def _libm(function, values):
+    """function applied per distinct value; NaN where it fails."""
+    def safe(value):
+        try:
+            return function(value)
+        except (ValueError, ZeroDivisionError, OverflowError):
+            return math.nan
+
+    distinct, inverse = np.unique(values, return_inverse=True)
+    results = np.fromiter(map(safe, distinct.tolist()), np.float64, len(distinct))
+    return results[inverse.reshape(-1)]
+
+
+def _pow(base, exponent):
+    return _libm(lambda value: value ** exponent, base)
+
+
+def _rpow(base, exponent):
+    return _libm(lambda value: base ** value, exponent)
+
+
+# ------------------ KERNELS ------------------
+# Each receives only rows whose inputs passed validation.
+
+def _bmi(weight, height):
+    return weight / _pow(height / 100, 2)
+
+
+def _bsa(weight, height):
+    # Mosteller formula (sqrt is exactly rounded in both NumPy and math)
+    return np.sqrt((height * weight) / 3600)
+
+
+def _egfr_ckd_epi(creatinine, age, sex):
+    female = sex == "Female"
+    k = np.where(female, 0.7, 0.9)
+    ratio = creatinine / k
+    low = np.minimum(ratio, 1.0)
+    # The exponent depends on sex, so apply each one to its own rows
+    low_term = np.empty_like(low)
+    low_term[female] = _pow(low[female], -0.329)
+    low_term[~female] = _pow(low[~female], -0.411)
+    sex_factor = np.where(female, 1.018, 1.0)
+    return 141 * low_term * _pow(np.maximum(ratio, 1.0), -1.209) * _rpow(0.993, age) * sex_factor
+
+
+def _meld(bilirubin, inr, creatinine):
+    return 3.78 * _libm(math.log, bilirubin) + 11.2 * _libm(math.log, inr) + 9.57 * _libm(math.log, creatinine) + 6.43
+
+
+def _predicted_pft(age, height, sex):
+    male = sex == "Male"
+    fev1 = np.where(male, (0.0414 * height) - (0.0244 * age) - 2.19, (0.0342 * height) - (0.0255 * age) - 1.578)
+    fvc = np.where(male, (0.0523 * height) - (0.0281 * age) - 3.59, (0.041 * height) - (0.0244 * age) - 2.190)
+    return {"fev1": fev1, "fvc": fvc, "ratio": (fev1 / fvc) * 100}
+
+
+def _cha2ds2_vasc(age, heart_failure, hypertension, stroke, vascular, female, diabetes):
+    score = np.where(age >= 75, 2, np.where(age >= 65, 1, 0))
+    return score + heart_failure + hypertension + 2 * stroke + vascular + diabetes + female
+
+
+def _has_bled(**criteria):
+    return np.sum(list(criteria.values()), axis=0)
+
+
+def _curb65(age, confusion, bun, rr, sbp, dbp):
+    # Summed as a stack: bool + bool in NumPy is a logical or, not a count
+    return np.sum([confusion, bun > 19, rr >= 30, (sbp < 90) | (dbp <= 60), age >= 65], axis=0)
+
+
+def _option_points(column, options):
+    return np.select([column == option for option in options], range(len(options)))
+
+
+def _child_pugh(bilirubin, albumin, inr, ascites, encephalopathy):
+    score = np.where(bilirubin < 2, 1, np.where(bilirubin <= 3, 2, 3))
+    score += np.where(albumin > 3.5, 1, np.where(albumin >= 2.8, 2, 3))
+    score += np.where(inr < 1.7, 1, np.where(inr <= 2.3, 2, 3))
+    score += 1 + _option_points(ascites, calculators.ASCITES_OPTIONS)
+    score += 1 + _option_points(encephalopathy, calculators.ENCEPHALOPATHY_OPTIONS)
+    return score
+
+
+def _wells_pe(**criteria):
+    # Points are multiples of 0.5, so the float sum is exact in any order
+    return sum(points * criteria[name] for name, _, points in calculators.WELLS_PE_CRITERIA)
+
+
+# Registry name -> vectorized kernel. Pure +-*/ formulas run unchanged on arrays.
+KERNELS = {
+    "BMI": _bmi,
+    "BMI in Pregnancy": _bmi,
+    "BSA": _bsa,
+    "eGFR": _egfr_ckd_epi,
+    "MELD": _meld,
+    "Predicted PFT": _predicted_pft,
+    "Corrected Calcium": calculators.corrected_calcium,
+    "Corrected Sodium": calculators.corrected_sodium,
+    "Anion Gap": calculators.anion_gap,
+    "Serum Osmolality": calculators.serum_osmolality,
+    "CHA2DS2-VASc": _cha2ds2_vasc,
+    "HAS-BLED": _has_bled,
+    "CURB-65": _curb65,
+    "Child-Pugh": _child_pugh,
+    "Wells Score PE": _wells_pe,
+}
+
+
+# ------------------ VALIDATION ------------------
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def as_numbers(values):
+    """float64 array; blank or non-numeric entries become NaN."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        values = np.asarray(values, dtype=object)
+        return np.fromiter(map(_to_float, values.ravel().tolist()), np.float64, values.size).reshape(values.shape)
+
+
+def _column(spec, values, n):
+    """(array, valid mask) for one input column under its declaration."""
+    if spec.kind in ("number", "integer"):
+        column = np.broadcast_to(as_numbers(values), (n,))
+        default = spec.initial()
+        if default is not None:
+            column = np.where(np.isnan(column), default, column)
+        valid = np.isfinite(column)
+        if spec.kind == "integer":
+            valid &= np.floor(column) == column
+        if spec.min is not None:
+            valid &= column >= spec.min
+        if spec.max is not None:
+            valid &= column <= spec.max
+        return column, valid
+    # bool / choice / date: parse each distinct entry exactly as the scalar path does
+    dtype = bool if spec.kind == "bool" else object
+    text = np.asarray(values)
+    if text.dtype.kind == "U":
+        # Text columns (e.g. from CSV) have a handful of distinct values
+        distinct, inverse = np.unique(np.broadcast_to(text, (n,)), return_inverse=True)
+        entries = [_parse_entry(spec, value) for value in distinct.tolist()]
+        parsed = np.array([value for value, _ in entries], dtype=dtype)
+        valid = np.array([ok for _, ok in entries], dtype=bool)
+        inverse = inverse.reshape(-1)
+        return parsed[inverse], valid[inverse]
+    column = np.broadcast_to(np.asarray(values, dtype=object), (n,))
+    parsed = np.zeros(n, dtype=dtype)
+    valid = np.ones(n, dtype=bool)
+    for i, value in enumerate(column.tolist()):
+        parsed[i], valid[i] = _parse_entry(spec, value)
+    return parsed, valid
+
+
+def _parse_entry(spec, value):
+    """(value, ok) for one entry; blanks take the declared default."""
+    if value is None or (isinstance(value, str) and not value.strip()) or (isinstance(value, float) and math.isnan(value)):
+        value = spec.initial()
+        if value is None:
+            return None, not spec.required
+    try:
+        return spec.parse(value), True
+    except ValueError:
+        return None, False
+
+
+def _length(columns, n=None):
+    lengths = {np.size(values) for values in columns.values() if np.ndim(values) > 0}
+    if n is not None:
+        lengths.add(n)
+    if len(lengths) > 1:
+        raise ValueError(f"input columns have different lengths: {sorted(lengths)}")
+    return lengths.pop() if lengths else 1
+
+
+# ------------------ SCORING ------------------
+
+def _score_rows(calc, columns, n):
+    """Row-by-row fallback through the scalar function."""
+    arrays = {name: np.broadcast_to(np.asarray(values, dtype=object), (n,)) for name, values in columns.items()}
+    rows = {output.name: [None] * n for output in calc.outputs}
+    for i in range(n):
+        raw = {name: array[i] for name, array in arrays.items()}
+        raw = {name: None if isinstance(value, float) and math.isnan(value) else value for name, value in raw.items()}
+        try:
+            values, missing = calc.parse(raw)
+            if missing:
+                continue
+            results = calc.compute(values)
+        except ValueError:
+            continue
+        for name, value in results.items():
+            rows[name][i] = value
+    out = {}
+    for name, values in rows.items():
+        if all(value is None or isinstance(value, (bool, int, float)) for value in values):
+            out[name] = np.array([math.nan if value is None else value for value in values], dtype=np.float64)
+        else:
+            out[name] = np.array(values, dtype=object)
+    return out
+
+
+def score(name, columns, n=None):
+    """
+    {output name: array} for one registry calculator over columns
+    ({input name: array or scalar}). Invalid rows are NaN (None for
+    non-numeric outputs such as dates). n fixes the row count, so a
+    calculator running on defaults alone (no columns) still returns n rows.
+    """
+    calc = calculators.CALCULATORS[name]
+    if calc.function is None:
+        raise KeyError(name)
+    n = _length(columns, n)
+    kernel = KERNELS.get(name)
+    if kernel is None:
+        return _score_rows(calc, columns, n)
+
+    inputs = {}
+    valid = np.ones(n, dtype=bool)
+    for spec in calc.inputs:
+        if spec.name not in columns and spec.initial() is None:
+            raise ValueError(f"missing input column: {spec.name}")
+        column, ok = _column(spec, columns.get(spec.name), n)
+        inputs[spec.name] = column
+        valid &= ok
+
+    with np.errstate(all="ignore"):
+        results = kernel(**{key: column[valid] for key, column in inputs.items()})
+    if not isinstance(results, dict):
+        results = {calc.outputs[0].name: results}
+    # A row fails as a whole, as a scalar calculation would
+    finite = np.ones(int(valid.sum()), dtype=bool)
+    for values in results.values():
+        finite &= np.isfinite(values)
+    rows = np.flatnonzero(valid)[finite]
+    out = {}
+    for key, values in results.items():
+        column = np.full(n, np.nan)
+        column[rows] = values[finite]
+        out[key] = column
+    return out
+
+
+# ------------------ ARRAY FUNCTIONS ------------------
+
+def bmi(weight, height):
+    return score("BMI", {"weight": weight, "height": height})["bmi"]
+
+
+def bsa(weight, height):
+    return score("BSA", {"weight": weight, "height": height})["bsa"]
+
+
+def egfr_ckd_epi(creatinine, age, sex):
+    return score("eGFR", {"creatinine": creatinine, "age": age, "sex": sex})["egfr"]
+
+
+def meld(bilirubin, inr, creatinine):
+    return score("MELD", {"bilirubin": bilirubin, "inr": inr, "creatinine": creatinine})["meld"]
+
+
+def corrected_calcium(calcium, albumin):
+    return score("Corrected Calcium", {"calcium": calcium, "albumin": albumin})["corrected_calcium"]
+
+
+def corrected_sodium(sodium, glucose):
+    return score("Corrected Sodium", {"sodium": sodium, "glucose": glucose})["corrected_sodium"]
+
+
+def anion_gap(sodium, chloride, bicarbonate):
+    return score("Anion Gap", {"sodium": sodium, "chloride": chloride, "bicarbonate": bicarbonate})["anion_gap"]
+
+
+def serum_osmolality(sodium, glucose, bun):
+    return score("Serum Osmolality", {"sodium": sodium, "glucose": glucose, "bun": bun})["osmolality"]
+
+
+def predicted_pft(age, height, sex):
+    """{"fev1", "fvc", "ratio"} arrays."""
+    return score("Predicted PFT", {"age": age, "height": height, "sex": sex})
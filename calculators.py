@@ -0,0 +1,1161 @@
+import math
+from datetime import date, timedelta
+
+# ------------------ CALCULATOR REGISTRY ------------------
+# Every medical calculator as a pure function plus a declaration of its
+# inputs (with units and bounds), outputs and interpretation bands. The
+# Calculator page renders straight from these declarations, and the API and
+# batch tools call the same functions without Streamlit:
+#
+#     calculators.calculate("BMI", {"weight": 70, "height": 175})
+#     calculators.bmi(70, 175)
+#
+# CALCULATORS maps a calculator name to its single definition, so lookup is
+# one dict access. A calculator listed under several categories (eGFR,
+# Creatinine Clearance) is still defined once.
+
+# Input kinds: "number" (free numeric entry), "integer" (bounded counter),
+# "bool", "choice" (one of options) and "date"
+KINDS = ("number", "integer", "bool", "choice", "date")
+
+
+class Input:
+    """One calculator input. when=(input, value) shows it only for that value."""
+
+    __slots__ = ("name", "label", "unit", "kind", "options", "default", "min", "max", "required", "when")
+
+    def __init__(self, name, label, unit="", kind="number", options=(), default=None,
+                 min=None, max=None, required=True, when=None):
+        self.name = name
+        self.label = label
+        self.unit = unit
+        self.kind = kind
+        self.options = tuple(options)
+        self.default = default
+        self.min = min
+        self.max = max
+        self.required = required
+        self.when = when
+
+    @property
+    def display_label(self):
+        return f"{self.label} ({self.unit})" if self.unit else self.label
+
+    def initial(self):
+        """Default value (callable defaults, e.g. today's date, are evaluated)."""
+        return self.default() if callable(self.default) else self.default
+
+    def parse(self, value):
+        """Typed value for a raw entry (UI string or JSON value)."""
+        if self.kind == "bool":
+            if isinstance(value, str):
+                return value.strip().lower() in ("1", "true", "yes", "on")
+            return bool(value)
+        if self.kind == "choice":
+            if value not in self.options:
+                raise ValueError(f"{self.label} must be one of: {', '.join(self.options)}")
+            return value
+        if self.kind == "date":
+            if isinstance(value, date):
+                return value
+            try:
+                return date.fromisoformat(str(value))
+            except ValueError:
+                raise ValueError(f"{self.label} must be a date (YYYY-MM-DD)")
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{self.label} must be a number")
+        if not math.isfinite(number):
+            raise ValueError(f"{self.label} must be a finite number")
+        if self.kind == "integer":
+            if number != int(number):
+                raise ValueError(f"{self.label} must be a whole number")
+            number = int(number)
+        if self.min is not None and number < self.min:
+            raise ValueError(f"{self.label} must be at least {self.min}")
+        if self.max is not None and number > self.max:
+            raise ValueError(f"{self.label} must be at most {self.max}")
+        return number
+
+    def describe(self):
+        spec = {"name": self.name, "label": self.label, "unit": self.unit, "kind": self.kind, "required": self.required}
+        if self.options:
+            spec["options"] = list(self.options)
+        if self.default is not None and not callable(self.default):
+            spec["default"] = self.default
+        if self.min is not None:
+            spec["min"] = self.min
+        if self.max is not None:
+            spec["max"] = self.max
+        if self.when:
+            spec["when"] = {self.when[0]: self.when[1]}
+        return spec
+
+
+class Band:
+    """An interpretation for output values within the given bounds (all optional)."""
+
+    __slots__ = ("level", "label", "bounds")
+
+    # Bound keyword -> comparison
+    TESTS = {
+        "lt": lambda v, b: v < b,
+        "le": lambda v, b: v <= b,
+        "gt": lambda v, b: v > b,
+        "ge": lambda v, b: v >= b,
+        "eq": lambda v, b: v == b,
+    }
+
+    def __init__(self, level, label, **bounds):
+        self.level = level          # "info", "success", "warning" or "error"
+        self.label = label
+        self.bounds = bounds
+
+    def matches(self, value):
+        return all(self.TESTS[op](value, bound) for op, bound in self.bounds.items())
+
+    def describe(self):
+        return dict(level=self.level, label=self.label, **self.bounds)
+
+
+class Output:
+    """One calculator result; bands are tried in order, first match wins."""
+
+    __slots__ = ("name", "label", "unit", "fmt", "bands", "hidden")
+
+    def __init__(self, name, label, unit="", fmt="", bands=(), hidden=False):
+        self.name = name
+        self.label = label
+        self.unit = unit
+        self.fmt = fmt              # format spec, or a function value -> text
+        self.bands = tuple(bands)
+        self.hidden = hidden        # interpretation only (e.g. a yes/no risk flag)
+
+    def format(self, value):
+        text = self.fmt(value) if callable(self.fmt) else format(value, self.fmt)
+        return f"{text} {self.unit}" if self.unit else text
+
+    def interpret(self, value):
+        if value is None:
+            return None
+        return next((band for band in self.bands if band.matches(value)), None)
+
+    def describe(self):
+        return {"name": self.name, "label": self.label, "unit": self.unit,
+                "bands": [band.describe() for band in self.bands]}
+
+
+class Calculator:
+    """A named pure function with its declared inputs and outputs."""
+
+    __slots__ = ("name", "function", "inputs", "outputs", "title", "formula", "notes", "confirm", "summary")
+
+    def __init__(self, name, function, inputs=(), outputs=(), title=None, formula=None,
+                 notes=None, confirm=None, summary=False):
+        self.name = name
+        self.function = function    # None for calculators that are not available yet
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.title = title
+        self.formula = formula      # LaTeX
+        self.notes = notes          # Markdown shown below the result
+        self.confirm = confirm      # button label, if the result waits for a click
+        self.summary = summary      # offer a copyable plain-text summary
+
+    def active_inputs(self, values):
+        """Inputs that apply given the (choice) values entered so far."""
+        return [spec for spec in self.inputs if spec.when is None or values.get(spec.when[0]) == spec.when[1]]
+
+    def parse(self, raw):
+        """
+        (typed values, names of missing required inputs) for raw entries.
+        Blank entries count as missing; malformed ones raise ValueError.
+        """
+        values = {spec.name: None for spec in self.inputs}
+        missing = []
+        for spec in self.inputs:
+            if spec.when is not None and values.get(spec.when[0]) != spec.when[1]:
+                continue
+            value = raw.get(spec.name)
+            if value is None or (isinstance(value, str) and not value.strip()):
+                value = spec.initial()
+            if value is None:
+                if spec.required:
+                    missing.append(spec.name)
+                continue
+            values[spec.name] = spec.parse(value)
+        return values, missing
+
+    def compute(self, values):
+        """{output name: value}; ValueError when the inputs cannot be used."""
+        try:
+            result = self.function(**values)
+        except ZeroDivisionError:
+            raise ValueError("These values would divide by zero.")
+        except OverflowError:
+            raise ValueError("These values are out of range for this calculator.")
+        except ValueError as exc:
+            # math domain errors (e.g. log of zero) carry no useful message
+            if str(exc) in ("math domain error", "math range error"):
+                raise ValueError("These values are out of range for this calculator.")
+            raise
+        if not isinstance(result, dict):
+            result = {self.outputs[0].name: result}
+        return result
+
+    def interpret(self, results):
+        """[(output, band)] for the outputs that have a matching band."""
+        found = []
+        for output in self.outputs:
+            band = output.interpret(results.get(output.name))
+            if band is not None:
+                found.append((output, band))
+        return found
+
+    def summary_text(self, values, results):
+        lines = [f"Calculator: {self.name}"]
+        for spec in self.active_inputs(values):
+            value = values.get(spec.name)
+            if value is not None:
+                text = value.strftime(DATE_FORMAT) if isinstance(value, date) else value
+                lines.append(f"{spec.display_label}: {text}")
+        for output in self.outputs:
+            value = results.get(output.name)
+            if value is not None and not output.hidden:
+                lines.append(f"{output.label}: {output.format(value)}")
+        return "\n".join(lines)
+
+    def describe(self):
+        return {
+            "name": self.name,
+            "title": self.title,
+            "available": self.function is not None,
+            "inputs": [spec.describe() for spec in self.inputs],
+            "outputs": [output.describe() for output in self.outputs],
+        }
+
+
+def calculate(name, inputs):
+    """
+    Run a calculator by name on raw inputs: (results, [(output, band)]).
+    KeyError for unknown or unavailable calculators, ValueError for bad input.
+    """
+    calc = CALCULATORS[name]
+    if calc.function is None:
+        raise KeyError(name)
+    values, missing = calc.parse(inputs)
+    if missing:
+        raise ValueError(f"Missing inputs: {', '.join(missing)}")
+    results = calc.compute(values)
+    return results, calc.interpret(results)
+
+
+# ------------------ FORMATTING HELPERS ------------------
+
+DATE_FORMAT = "%d-%b-%Y"
+
+
+def weeks_days(days):
+    w, d = divmod(days, 7)
+    return f"{w} week{'s' if w != 1 else ''} {d} day{'s' if d != 1 else ''} ({days} days)"
+
+
+def _today():
+    return date.today()
+
+
+def _weeks_ago(weeks):
+    return lambda: date.today() - timedelta(weeks=weeks)
+
+
+# ------------------ FORMULAS: GENERAL ------------------
+
+def bmi(weight, height):
+    return weight / (height / 100) ** 2
+
+
+def bsa(weight, height):
+    # Mosteller formula
+    return math.sqrt((height * weight) / 3600)
+
+
+def ideal_body_weight(height, sex):
+    return (50 if sex == "Male" else 45.5) + 0.9 * (height - 152)
+
+
+def body_fat(sex, waist, neck, height, hip=None):
+    # US Navy formula
+    if sex == "Male":
+        return 86.010 * math.log10(waist - neck) - 70.041 * math.log10(height) + 36.76
+    return 163.205 * math.log10(waist + hip - neck) - 97.684 * math.log10(height) - 78.387
+
+
+def creatinine_clearance(age, weight, creatinine, sex):
+    # Cockcroft-Gault
+    crcl = ((140 - age) * weight) / (72 * creatinine)
+    return crcl * 0.85 if sex == "Female" else crcl
+
+
+def mean_arterial_pressure(sbp, dbp):
+    return (2 * dbp + sbp) / 3
+
+
+# ------------------ FORMULAS: CARDIOLOGY ------------------
+
+def cha2ds2_vasc(age, heart_failure, hypertension, stroke, vascular, female, diabetes):
+    score = 2 if age >= 75 else 1 if age >= 65 else 0
+    score += heart_failure + hypertension + 2 * stroke + vascular + diabetes + female
+    return score
+
+
+def has_bled(hypertension, abnormal_renal_liver, stroke, bleeding, labile_inr, elderly, drugs_alcohol):
+    return sum([hypertension, abnormal_renal_liver, stroke, bleeding, labile_inr, elderly, drugs_alcohol])
+
+
+def target_heart_rate(max_hr, resting_hr):
+    # Karvonen, 70% intensity
+    return 0.7 * (max_hr - resting_hr) + resting_hr
+
+
+def framingham_risk(age, total_chol, hdl, sbp, smoker, diabetic):
+    # Simplified risk factor points, 2.5% per point (capped at 30%)
+    risk = 2 * sum([age >= 50, total_chol > 200, hdl < 40, sbp > 140, smoker, diabetic])
+    return min(30, risk * 2.5)
+
+
+def timi_risk(age65, risk_factors, known_cad, aspirin, recent_angina, st_deviation, elevated_markers):
+    return sum([age65, risk_factors >= 3, known_cad, aspirin, recent_angina, st_deviation, elevated_markers])
+
+
+def grace_score(age, heart_rate, sbp, creatinine):
+    # Simplified linear approximation
+    grace = (0.04 * age) + (0.03 * heart_rate) - (0.05 * sbp) + (1.2 * creatinine)
+    return round(grace * 10, 1)
+
+
+def egfr_ckd_epi(creatinine, age, sex):
+    # CKD-EPI 2009 (without race coefficient)
+    if sex == "Female":
+        k, a, sex_factor = 0.7, -0.329, 1.018
+    else:
+        k, a, sex_factor = 0.9, -0.411, 1.0
+    return 141 * min(creatinine / k, 1) ** a * max(creatinine / k, 1) ** -1.209 * (0.993 ** age) * sex_factor
+
+
+# ------------------ FORMULAS: MENTAL HEALTH ------------------
+
+FREQUENCY_OPTIONS = ("Not at all (0)", "Several days (1)", "More than half the days (2)", "Nearly every day (3)")
+
+GAD7_QUESTIONS = (
+    "Feeling nervous, anxious, or on edge",
+    "Not being able to stop worrying",
+    "Worrying too much about different things",
+    "Trouble relaxing",
+    "Restless that it is hard to sit still",
+    "Becoming easily annoyed",
+    "Feeling afraid something awful might happen",
+)
+
+PHQ9_QUESTIONS = (
+    "Little interest or pleasure in doing things",
+    "Feeling down, depressed, or hopeless",
+    "Trouble sleeping or sleeping too much",
+    "Feeling tired",
+    "Poor appetite or overeating",
+    "Feeling bad about yourself",
+    "Trouble concentrating",
+    "Moving slowly or fidgety",
+    "Thoughts of self-harm",
+)
+
+
+def questionnaire_score(**answers):
+    return sum(FREQUENCY_OPTIONS.index(answer) for answer in answers.values())
+
+
+def mmse(orientation, registration, attention, recall, language):
+    return orientation + registration + attention + recall + language
+
+
+# ------------------ FORMULAS: PULMONOLOGY ------------------
+
+WELLS_PE_CRITERIA = (
+    ("dvt_signs", "Clinical signs of DVT", 3),
+    ("pe_likely", "PE is #1 diagnosis or equally likely", 3),
+    ("tachycardia", "Heart rate >100 bpm", 1.5),
+    ("immobilization", "Immobilization ≥3 days / surgery in last 4 weeks", 1.5),
+    ("previous_vte", "Previous DVT/PE", 1.5),
+    ("hemoptysis", "Hemoptysis", 1),
+    ("malignancy", "Malignancy", 1),
+)
+_WELLS_PE_POINTS = {name: points for name, _, points in WELLS_PE_CRITERIA}
+
+
+def wells_pe(**criteria):
+    return sum(_WELLS_PE_POINTS[name] * present for name, present in criteria.items())
+
+
+def curb65(age, confusion, bun, rr, sbp, dbp):
+    return sum([confusion, bun > 19, rr >= 30, sbp < 90 or dbp <= 60, age >= 65])
+
+
+def pf_ratio(pao2, fio2):
+    return pao2 / (fio2 / 100)
+
+
+def predicted_pft(age, height, sex):
+    if sex == "Male":
+        fev1 = (0.0414 * height) - (0.0244 * age) - 2.19
+        fvc = (0.0523 * height) - (0.0281 * age) - 3.59
+    else:
+        fev1 = (0.0342 * height) - (0.0255 * age) - 1.578
+        fvc = (0.041 * height) - (0.0244 * age) - 2.190
+    return {"fev1": fev1, "fvc": fvc, "ratio": (fev1 / fvc) * 100}
+
+
+# ------------------ FORMULAS: NEPHROLOGY ------------------
+
+def fena(na_serum, na_urine, cr_serum, cr_urine):
+    return (na_urine * cr_serum) / (na_serum * cr_urine) * 100
+
+
+def urine_output_rate(weight, urine, hours):
+    return urine / weight / hours
+
+
+# ------------------ FORMULAS: ENDOCRINOLOGY ------------------
+
+def estimated_average_glucose(hba1c):
+    return 28.7 * hba1c - 46.7
+
+
+def homa_ir(insulin, glucose):
+    return (insulin * glucose) / 405
+
+
+def total_daily_insulin(weight):
+    return weight * 0.5
+
+
+def corrected_calcium(calcium, albumin):
+    return calcium + 0.8 * (4 - albumin)
+
+
+def corrected_sodium(sodium, glucose):
+    return sodium + 1.6 * ((glucose - 100) / 100)
+
+
+def calcium_phosphate_product(calcium, phosphate):
+    return calcium * phosphate
+
+
+def frax_screen(age, t_score):
+    return age > 65 or t_score < -2.5
+
+
+def serum_osmolality(sodium, glucose, bun):
+    return 2 * sodium + glucose / 18 + bun / 2.8
+
+
+def water_deficit(weight, sodium, sex):
+    tbw = 0.6 * weight if sex == "Male" else 0.5 * weight
+    return tbw * ((sodium / 140) - 1)
+
+
+def anion_gap(sodium, chloride, bicarbonate):
+    return sodium - (chloride + bicarbonate)
+
+
+# ------------------ FORMULAS: HEMATOLOGY ------------------
+
+def ratio(numerator, denominator):
+    return numerator / denominator
+
+
+def inr(patient_pt, control_pt, isi):
+    if control_pt <= 0:
+        raise ValueError("Control PT must be greater than 0!")
+    return (patient_pt / control_pt) ** isi
+
+
+def aptt_ratio(patient_aptt, control_aptt):
+    if control_aptt <= 0:
+        raise ValueError("Enter a valid Control APTT.")
+    return patient_aptt / control_aptt
+
+
+# ------------------ FORMULAS: GASTROENTEROLOGY ------------------
+
+ASCITES_OPTIONS = ("None", "Mild", "Moderate-Severe")
+ENCEPHALOPATHY_OPTIONS = ("None", "Grade 1-2", "Grade 3-4")
+
+
+def child_pugh(bilirubin, albumin, inr, ascites, encephalopathy):
+    score = 1 if bilirubin < 2 else 2 if bilirubin <= 3 else 3
+    score += 1 if albumin > 3.5 else 2 if albumin >= 2.8 else 3
+    score += 1 if inr < 1.7 else 2 if inr <= 2.3 else 3
+    score += 1 + ASCITES_OPTIONS.index(ascites)
+    score += 1 + ENCEPHALOPATHY_OPTIONS.index(encephalopathy)
+    return score
+
+
+def meld(bilirubin, inr, creatinine):
+    return 3.78 * math.log(bilirubin) + 11.2 * math.log(inr) + 9.57 * math.log(creatinine) + 6.43
+
+
+# ------------------ FORMULAS: CRITICAL CARE ------------------
+
+def sirs(temperature, heart_rate, rr, wbc):
+    return sum([temperature < 36 or temperature > 38, heart_rate > 90, rr > 20, wbc < 4 or wbc > 12])
+
+
+# ------------------ FORMULAS: OBSTETRICS ------------------
+
+# Naegele's rule: EDD is 280 days (40 weeks) after the LMP, 266 after conception
+TOTAL_GA_DAYS = 280
+CONCEPTION_OFFSET_DAYS = 266
+DATING_METHODS = (
+    "Last Menstrual Period (LMP) — Naegele's rule",
+    "Conception date (if known)",
+    "Ultrasound (CRL / Gestational Age)",
+)
+
+
+def gestational_age(lmp, ref_date):
+    return (ref_date - lmp).days
+
+
+def edd_estimate(method, ref_date, lmp=None, cycle_len=None, conception=None,
+                 scan_date=None, scan_weeks=None, scan_days=None):
+    if method == DATING_METHODS[0]:
+        # Adjusted by (cycle length - 28) days
+        edd = lmp + timedelta(days=TOTAL_GA_DAYS + (cycle_len - 28))
+        ga_days = (ref_date - lmp).days
+    elif method == DATING_METHODS[1]:
+        edd = conception + timedelta(days=CONCEPTION_OFFSET_DAYS)
+        # Gestational age conventionally counts from ~2 weeks before conception
+        ga_days = (ref_date - conception).days + 14
+    else:
+        ga_at_scan = scan_weeks * 7 + scan_days
+        edd = scan_date + timedelta(days=TOTAL_GA_DAYS - ga_at_scan)
+        ga_days = ga_at_scan + (ref_date - scan_date).days
+    return {"edd": edd, "ga_days": max(0, ga_days)}
+
+
+def trimester(ga_days):
+    weeks = ga_days / 7
+    return "1st trimester" if weeks < 14 else "2nd trimester" if weeks < 28 else "3rd trimester"
+
+
+def ga_from_edd(edd, ref_date):
+    days_until_edd = (edd - ref_date).days
+    ga_days = TOTAL_GA_DAYS - days_until_edd
+    return {
+        "days_until_edd": days_until_edd,
+        "ga_days": ga_days,
+        "trimester": trimester(ga_days),
+        "conception_date": edd - timedelta(days=CONCEPTION_OFFSET_DAYS),
+        "progress": ga_days / TOTAL_GA_DAYS * 100,
+    }
+
+
+CONSISTENCY_OPTIONS = ("Firm", "Medium", "Soft")
+POSITION_OPTIONS = ("Posterior", "Mid", "Anterior")
+
+
+def bishop_score(dilation, effacement, station, consistency, position):
+    # Simple approximation
+    score = dilation + (effacement // 10) + (station + 3)
+    return score + CONSISTENCY_OPTIONS.index(consistency) + POSITION_OPTIONS.index(position)
+
+
+# ------------------ FORMULAS: SURGERY ------------------
+
+def abpi(brachial_right=None, brachial_left=None, ankle_right=None, ankle_left=None):
+    highest_brachial = max(brachial_right or 0, brachial_left or 0)
+    if highest_brachial == 0:
+        raise ValueError("Brachial pressure cannot be 0.")
+    return {
+        "right": ankle_right / highest_brachial if ankle_right else None,
+        "left": ankle_left / highest_brachial if ankle_left else None,
+    }
+
+
+# ------------------ DECLARATIONS ------------------
+
+SEX = ("Male", "Female")
+
+WEIGHT = Input("weight", "Weight", "kg", min=0)
+HEIGHT = Input("height", "Height", "cm", min=0)
+AGE = Input("age", "Age", "years", min=0)
+SEX_INPUT = Input("sex", "Sex", kind="choice", options=SEX)
+CREATININE = Input("creatinine", "Serum Creatinine", "mg/dL", min=0)
+SBP = Input("sbp", "Systolic BP", "mmHg", min=0)
+REF_DATE = Input("ref_date", "Reference date", kind="date", default=_today)
+
+BMI_BANDS = (
+    Band("info", "Underweight", lt=18.5),
+    Band("success", "Normal weight", lt=25),
+    Band("warning", "Overweight", lt=30),
+    Band("error", "Obese"),
+)
+
+ABPI_BANDS = (
+    Band("warning", "Arterial calcification / non-compressible vessels", gt=1.3),
+    Band("success", "Normal", ge=0.91),
+    Band("warning", "Mild PAD", ge=0.80),
+    Band("error", "Moderate PAD", ge=0.50),
+    Band("error", "Severe PAD"),
+)
+
+
+def _checkboxes(*labels):
+    return [Input(name, label, kind="bool", default=False) for name, label in labels]
+
+
+REGISTRY = (
+    # ---------- GENERAL ----------
+    Calculator(
+        "BMI", bmi, (WEIGHT, HEIGHT),
+        [Output("bmi", "BMI", "kg/m²", ".2f", BMI_BANDS)],
+        formula=r"\text{BMI} = \frac{\text{Weight (kg)}}{\text{Height (m)}^2}",
+    ),
+    Calculator(
+        "BSA", bsa, (WEIGHT, HEIGHT),
+        [Output("bsa", "BSA", "m²", ".2f", (
+            Band("info", "BSA is low (typical for children).", lt=1.0),
+            Band("info", "BSA is within the expected range for adolescents or small adults.", lt=1.6),
+            Band("success", "BSA is within the normal adult range.", lt=2.2),
+            Band("warning", "BSA is higher than typical adult average (may be due to larger body size)."),
+        ))],
+        formula=r"\text{BSA} = \sqrt{\dfrac{\text{Height (cm)} \times \text{Weight (kg)}}{3600}}",
+    ),
+    Calculator(
+        "Ideal Body Weight", ideal_body_weight, (HEIGHT, SEX_INPUT),
+        [Output("ibw", "Ideal Body Weight", "kg", ".2f")],
+    ),
+    Calculator(
+        "Body Fat %", body_fat,
+        (
+            SEX_INPUT,
+            Input("waist", "Waist circumference", "cm", min=0),
+            Input("neck", "Neck circumference", "cm", min=0),
+            HEIGHT,
+            Input("hip", "Hip circumference", "cm", min=0, when=("sex", "Female")),
+        ),
+        [Output("body_fat", "Body Fat %", "%", ".2f")],
+        notes="US Navy circumference method.",
+    ),
+    Calculator(
+        "Creatinine Clearance", creatinine_clearance, (AGE, WEIGHT, CREATININE, SEX_INPUT),
+        [Output("crcl", "Creatinine Clearance", "mL/min", ".2f")],
+        formula=r"\text{CrCl} = \frac{(140 - \text{Age}) \times \text{Weight}}{72 \times S_{Cr}} \; (\times 0.85 \text{ if female})",
+    ),
+    Calculator(
+        "MAP", mean_arterial_pressure, (SBP, Input("dbp", "Diastolic BP", "mmHg", min=0)),
+        [Output("map", "Mean Arterial Pressure (MAP)", "mmHg", ".2f")],
+    ),
+
+    # ---------- CARDIOLOGY ----------
+    Calculator(
+        "CHA2DS2-VASc", cha2ds2_vasc,
+        [AGE] + _checkboxes(
+            ("heart_failure", "Heart Failure"), ("hypertension", "Hypertension"),
+            ("stroke", "Prior Stroke/TIA"), ("vascular", "Vascular disease"),
+            ("female", "Female sex"), ("diabetes", "Diabetes"),
+        ),
+        [Output("score", "CHA2DS2-VASc Score")],
+    ),
+    Calculator(
+        "HAS-BLED", has_bled,
+        _checkboxes(
+            ("hypertension", "Hypertension"), ("abnormal_renal_liver", "Abnormal renal/liver function"),
+            ("stroke", "Stroke"), ("bleeding", "Bleeding history"), ("labile_inr", "Labile INR"),
+            ("elderly", "Age >65"), ("drugs_alcohol", "Drugs/alcohol use"),
+        ),
+        [Output("score", "HAS-BLED Score")],
+    ),
+    Calculator(
+        "Heart Rate", target_heart_rate,
+        (Input("max_hr", "Maximum HR", "bpm", min=0), Input("resting_hr", "Resting HR", "bpm", min=0)),
+        [Output("target_hr", "Target HR (70% intensity)", "bpm", ".0f")],
+    ),
+    Calculator(
+        "Framingham Risk", framingham_risk,
+        [
+            AGE,
+            Input("total_chol", "Total Cholesterol", "mg/dL", min=0),
+            Input("hdl", "HDL Cholesterol", "mg/dL", min=0),
+            SBP,
+        ] + _checkboxes(("smoker", "Smoker"), ("diabetic", "Diabetic")),
+        [Output("risk", "Estimated 10-year CHD Risk", "%", ".1f", (
+            Band("info", "Low Risk (<10%)", lt=10),
+            Band("warning", "Moderate Risk (10–20%)", lt=20),
+            Band("error", "High Risk (>20%)"),
+        ))],
+        title="Framingham 10-year Cardiovascular Risk Score (Simplified)",
+        formula=r"\text{Risk} = \text{Sum of Risk Factors} \times 2.5\%",
+    ),
+    Calculator(
+        "TIMI Risk", timi_risk,
+        [
+            Input("age65", "Age ≥ 65 years", kind="bool", default=False),
+            Input("risk_factors", "Risk factors for CAD", kind="integer", default=0, min=0, max=5),
+        ] + _checkboxes(
+            ("known_cad", "Known CAD (stenosis ≥50%)"), ("aspirin", "Aspirin use in past 7 days"),
+            ("recent_angina", "≥2 Angina episodes in last 24h"), ("st_deviation", "ST deviation ≥0.5 mm"),
+            ("elevated_markers", "Elevated cardiac markers"),
+        ),
+        [Output("score", "TIMI Score", "/ 7", bands=(
+            Band("info", "Low Risk (≤8% event rate)", le=2),
+            Band("warning", "Intermediate Risk (~19%)", le=4),
+            Band("error", "High Risk (~41%)"),
+        ))],
+        title="TIMI Risk Score for Unstable Angina / NSTEMI",
+        formula=r"\text{TIMI Score} = \text{Sum of Positive Predictors}",
+    ),
+    Calculator(
+        "GRACE Score", grace_score,
+        (AGE, Input("heart_rate", "Heart Rate", "bpm", min=0), SBP, CREATININE),
+        [Output("grace", "GRACE (simplified)", fmt=".1f", bands=(
+            Band("info", "Low risk", lt=100),
+            Band("warning", "Moderate risk", lt=150),
+            Band("error", "High risk"),
+        ))],
+        title="Simplified GRACE Risk Score (ACS)",
+        formula=r"\text{GRACE} = 0.04A + 0.03HR - 0.05SBP + 1.2Cr",
+    ),
+    Calculator(
+        "eGFR", egfr_ckd_epi, (CREATININE, AGE, SEX_INPUT),
+        [Output("egfr", "eGFR", "mL/min/1.73m²", ".1f", (
+            Band("info", "Normal or high (G1)", ge=90),
+            Band("success", "Mildly decreased (G2)", ge=60),
+            Band("warning", "Mild–moderate decrease (G3a)", ge=45),
+            Band("warning", "Moderate–severe decrease (G3b)", ge=30),
+            Band("error", "Severe decrease (G4)", ge=15),
+            Band("error", "Kidney failure (G5)"),
+        ))],
+        title="Estimated Glomerular Filtration Rate (eGFR) — CKD-EPI",
+        formula=r"\text{eGFR} = 141 \times \min\left(\frac{Scr}{k},1\right)^a \times \max\left(\frac{Scr}{k},1\right)^{-1.209} \times 0.993^{Age} \times S",
+    ),
+
+    # ---------- MENTAL HEALTH ----------
+    Calculator(
+        "GAD-7", questionnaire_score,
+        [Input(f"q{i}", question, kind="choice", options=FREQUENCY_OPTIONS, default=FREQUENCY_OPTIONS[0])
+         for i, question in enumerate(GAD7_QUESTIONS, 1)],
+        [Output("score", "GAD-7 Score")],
+    ),
+    Calculator(
+        "PHQ-9", questionnaire_score,
+        [Input(f"q{i}", question, kind="choice", options=FREQUENCY_OPTIONS, default=FREQUENCY_OPTIONS[0])
+         for i, question in enumerate(PHQ9_QUESTIONS, 1)],
+        [Output("score", "PHQ-9 Score")],
+    ),
+    Calculator(
+        "MMSE", mmse,
+        (
+            Input("orientation", "Orientation (0–10)", kind="integer", default=0, min=0, max=10),
+            Input("registration", "Registration (0–3)", kind="integer", default=0, min=0, max=3),
+            Input("attention", "Attention & Calculation (0–5)", kind="integer", default=0, min=0, max=5),
+            Input("recall", "Recall (0–3)", kind="integer", default=0, min=0, max=3),
+            Input("language", "Language (0–9)", kind="integer", default=0, min=0, max=9),
+        ),
+        [Output("total", "Total MMSE Score", "/ 30", bands=(
+            Band("info", "Normal cognition (25–30)", ge=25),
+            Band("warning", "Mild cognitive impairment (21–24)", ge=21),
+            Band("error", "Moderate cognitive impairment (10–20)", ge=10),
+            Band("error", "Severe cognitive impairment (<10)"),
+        ))],
+        title="Mini-Mental State Examination (MMSE)",
+        formula=r"\text{MMSE Total} = \text{Orientation} + \text{Registration} + \text{Attention} + \text{Recall} + \text{Language}",
+        notes="Screening tool to assess cognitive function (maximum 30 points). "
+              "Interpretation may vary slightly depending on age and education level.",
+        confirm="Calculate MMSE",
+    ),
+
+    # ---------- PULMONOLOGY ----------
+    Calculator(
+        "Wells Score PE", wells_pe,
+        _checkboxes(*((name, label) for name, label, _ in WELLS_PE_CRITERIA)),
+        [Output("score", "Wells Score for PE", bands=(
+            Band("error", "High probability", gt=6),
+            Band("warning", "Moderate probability", ge=2),
+            Band("info", "Low probability"),
+        ))],
+    ),
+    Calculator(
+        "CURB-65", curb65,
+        [
+            AGE,
+            Input("confusion", "Confusion", kind="bool", default=False),
+            Input("bun", "BUN", "mg/dL", min=0),
+            Input("rr", "Respiratory rate", "/min", min=0),
+            SBP,
+            Input("dbp", "Diastolic BP", "mmHg", min=0),
+        ],
+        [Output("score", "CURB-65 Score")],
+        notes="One point each: confusion, BUN >19 mg/dL, respiratory rate ≥30, SBP <90 or DBP ≤60 mmHg, age ≥65.",
+    ),
+    Calculator(
+        "PaO2/FiO2", pf_ratio,
+        (Input("pao2", "PaO2", "mmHg", min=0), Input("fio2", "FiO2", "%", min=0)),
+        [Output("ratio", "PaO2/FiO2 Ratio", fmt=".0f", bands=(
+            Band("error", "Severe ARDS", lt=100),
+            Band("warning", "Moderate ARDS", lt=200),
+            Band("info", "Mild / Normal"),
+        ))],
+    ),
+    Calculator(
+        "Predicted PFT", predicted_pft, (AGE, HEIGHT, SEX_INPUT),
+        [
+            Output("fev1", "Predicted FEV₁", "L", ".2f"),
+            Output("fvc", "Predicted FVC", "L", ".2f"),
+            Output("ratio", "Predicted FEV₁/FVC Ratio", "%", ".1f"),
+        ],
+        title="Predicted Pulmonary Function Test Values (FEV₁, FVC)",
+        formula=r"\text{FEV₁/FVC Ratio} = \frac{\text{FEV₁}}{\text{FVC}} \times 100",
+    ),
+
+    # ---------- NEPHROLOGY ----------
+    Calculator(
+        "FeNa", fena,
+        (
+            Input("na_serum", "Serum Na", "mmol/L", min=0),
+            Input("na_urine", "Urine Na", "mmol/L", min=0),
+            Input("cr_serum", "Serum Creatinine", "mg/dL", min=0),
+            Input("cr_urine", "Urine Creatinine", "mg/dL", min=0),
+        ),
+        [Output("fena", "FeNa", "%", ".2f")],
+    ),
+    Calculator(
+        "Urine Output", urine_output_rate,
+        (WEIGHT, Input("urine", "Urine output", "mL", min=0), Input("hours", "Time", "hours", min=0)),
+        [Output("rate", "Urine Output Rate", "mL/kg/hr", ".2f")],
+    ),
+
+    # ---------- ENDOCRINOLOGY ----------
+    Calculator(
+        "HbA1c to Avg Glucose", estimated_average_glucose, (Input("hba1c", "HbA1c", "%", min=0),),
+        [Output("eag", "Estimated Average Glucose", "mg/dL", ".0f")],
+        formula=r"eAG (mg/dL) = (28.7 \times HbA1c) - 46.7",
+    ),
+    Calculator(
+        "HOMA-IR", homa_ir,
+        (Input("insulin", "Fasting Insulin", "µU/mL", min=0), Input("glucose", "Fasting Glucose", "mg/dL", min=0)),
+        [Output("homa_ir", "HOMA-IR", fmt=".2f", bands=(
+            Band("warning", "Suggestive of insulin resistance", gt=2.5),
+        ))],
+        formula=r"HOMA-IR = \frac{Fasting\ Insulin (\mu U/mL) \times Fasting\ Glucose (mg/dL)}{405}",
+    ),
+    Calculator(
+        "Total Daily Insulin Requirement", total_daily_insulin, (WEIGHT,),
+        [Output("tdi", "Approx. Total Daily Insulin", "units/day", ".1f")],
+        formula=r"TDI = 0.5 \times Weight (kg)",
+        notes="50% basal, 50% bolus (approx.)",
+    ),
+    Calculator(
+        "Corrected Calcium", corrected_calcium,
+        (Input("calcium", "Measured Calcium", "mg/dL", min=0), Input("albumin", "Albumin", "g/dL", min=0)),
+        [Output("corrected_calcium", "Corrected Calcium", "mg/dL", ".2f")],
+        formula=r"Corrected\ Ca = Measured\ Ca + 0.8 \times (4 - Albumin)",
+    ),
+    Calculator(
+        "Corrected Sodium", corrected_sodium,
+        (Input("sodium", "Measured Sodium", "mEq/L", min=0), Input("glucose", "Glucose", "mg/dL", min=0)),
+        [Output("corrected_sodium", "Corrected Sodium", "mEq/L", ".1f")],
+        formula=r"Corrected\ Na^+ = Measured\ Na^+ + 1.6 \times \frac{(Glucose-100)}{100}",
+    ),
+    Calculator(
+        "Calcium-Phosphate Product", calcium_phosphate_product,
+        (Input("calcium", "Calcium", "mg/dL", min=0), Input("phosphate", "Phosphate", "mg/dL", min=0)),
+        [Output("product", "Ca × P", fmt=".1f", bands=(
+            Band("warning", "High risk of vascular calcification (esp. in CKD)", gt=55),
+        ))],
+        formula=r"Ca \times P = Serum\ Calcium \times Serum\ Phosphate",
+    ),
+    Calculator(
+        "FRAX", frax_screen,
+        (Input("age", "Age", "years", kind="integer", min=0), Input("t_score", "T-score")),
+        [Output("high_risk", "High fracture risk", hidden=True, bands=(
+            Band("warning", "High fracture risk", eq=True),
+            Band("success", "Lower fracture risk"),
+        ))],
+        formula=r"FRAX = Risk\ Algorithm\ (Age, Sex, BMD, Clinical\ factors)",
+        notes="Full FRAX requires age, sex, BMI, BMD & risk factors.",
+    ),
+    Calculator(
+        "Serum Osmolality", serum_osmolality,
+        (
+            Input("sodium", "Sodium", "mEq/L", min=0),
+            Input("glucose", "Glucose", "mg/dL", min=0),
+            Input("bun", "BUN", "mg/dL", min=0),
+        ),
+        [Output("osmolality", "Serum Osmolality", "mOsm/kg", ".1f")],
+        formula=r"Serum\ Osmolality = 2 \times Na^+ + \frac{Glucose}{18} + \frac{BUN}{2.8}",
+    ),
+    Calculator(
+        "Water Deficit", water_deficit,
+        (WEIGHT, Input("sodium", "Serum Sodium", "mEq/L", min=0), SEX_INPUT),
+        [Output("deficit", "Water Deficit", "L", ".1f")],
+        formula=r"Water\ Deficit = TBW \times \left(\frac{Na}{140} - 1\right)",
+    ),
+    Calculator(
+        "Anion Gap", anion_gap,
+        (
+            Input("sodium", "Sodium", "mEq/L", min=0),
+            Input("chloride", "Chloride", "mEq/L", min=0),
+            Input("bicarbonate", "Bicarbonate (HCO3-)", "mEq/L", min=0),
+        ),
+        [Output("anion_gap", "Anion Gap", "mEq/L", ".1f", (
+            Band("info", "Low Anion Gap (consider hypoalbuminemia or lab error)", lt=8),
+            Band("success", "Normal Anion Gap", le=12),
+            Band("warning", "High Anion Gap (consider metabolic acidosis, toxins, renal failure)"),
+        ))],
+        formula=r"Anion\ Gap = Na^+ - (Cl^- + HCO_3^-)",
+    ),
+
+    # ---------- HEMATOLOGY ----------
+    Calculator(
+        "INR", inr,
+        (
+            Input("patient_pt", "Patient PT", "seconds", min=0),
+            Input("control_pt", "Control PT", "seconds", min=0),
+            Input("isi", "ISI (International Sensitivity Index)", default=1.0, min=0),
+        ),
+        [Output("inr", "Calculated INR", fmt=".2f", bands=(
+            Band("warning", "Below normal range — may indicate increased clotting tendency.", lt=0.8),
+            Band("info", "Normal range (not on anticoagulation).", ge=0.8, le=1.2),
+            Band("success", "Therapeutic range for most indications (on warfarin).", ge=2.0, le=3.0),
+            Band("success", "Therapeutic range for mechanical valves or high-risk conditions.", ge=2.5, le=3.5),
+            Band("error", "High bleeding risk — consider dose adjustment or evaluation.", gt=4.0),
+            Band("warning", "Sub-therapeutic INR for anticoagulation."),
+        ))],
+        title="International Normalized Ratio (INR)",
+        formula=r"\text{INR} = \left( \frac{\text{Patient PT}}{\text{Control PT}} \right)^{\text{ISI}}",
+        notes="**Purpose:** Standardizes Prothrombin Time (PT) to monitor warfarin therapy or liver function.",
+    ),
+    Calculator(
+        "NLR", ratio,
+        (Input("numerator", "Neutrophils", "cells/μL", min=0), Input("denominator", "Lymphocytes", "cells/μL", min=0)),
+        [Output("nlr", "NLR", fmt=".2f")],
+    ),
+    Calculator(
+        "PLR", ratio,
+        (Input("numerator", "Platelets", "cells/μL", min=0), Input("denominator", "Lymphocytes", "cells/μL", min=0)),
+        [Output("plr", "PLR", fmt=".2f")],
+    ),
+    Calculator(
+        "APTT Ratio", aptt_ratio,
+        (Input("patient_aptt", "Patient APTT", "seconds", min=0), Input("control_aptt", "Control APTT", "seconds", min=0)),
+        [Output("ratio", "APTT Ratio", fmt=".2f")],
+        title="APTT (Activated Partial Thromboplastin Time) Calculator",
+        formula=r"\text{APTT Ratio} = \frac{\text{Patient APTT}}{\text{Control APTT}}",
+        notes="**Interpretation:**\n"
+              "- **Normal APTT Ratio:** 0.8 – 1.2\n"
+              "- **Prolonged (>1.5):** May indicate heparin therapy, coagulation factor deficiency, "
+              "liver disease or DIC (Disseminated Intravascular Coagulation)",
+    ),
+    Calculator(
+        "PT Ratio", inr,
+        (
+            Input("patient_pt", "Patient PT", "seconds", min=0),
+            Input("control_pt", "Control PT", "seconds", min=0),
+            Input("isi", "ISI (International Sensitivity Index)", min=0),
+        ),
+        [Output("inr", "INR", fmt=".2f")],
+        title="PT (Prothrombin Time) Calculator",
+        formula=r"\text{INR} = \left( \frac{\text{Patient PT}}{\text{Control PT}} \right)^{\text{ISI}}",
+        notes="**Interpretation:**\n"
+              "- **Normal INR:** 0.8 – 1.2\n"
+              "- **Therapeutic (Warfarin):** 2.0 – 3.0\n"
+              "- **High INR →** Increased bleeding risk\n"
+              "- **Low INR →** Thrombosis risk",
+    ),
+
+    # ---------- GASTROENTEROLOGY ----------
+    Calculator(
+        "Child-Pugh", child_pugh,
+        (
+            Input("bilirubin", "Bilirubin", "mg/dL", min=0),
+            Input("albumin", "Albumin", "g/dL", min=0),
+            Input("inr", "INR", min=0),
+            Input("ascites", "Ascites", kind="choice", options=ASCITES_OPTIONS, default="None"),
+            Input("encephalopathy", "Encephalopathy", kind="choice", options=ENCEPHALOPATHY_OPTIONS, default="None"),
+        ),
+        [Output("score", "Child-Pugh Score")],
+    ),
+    Calculator(
+        "MELD", meld,
+        (
+            Input("bilirubin", "Bilirubin", "mg/dL", min=0),
+            Input("inr", "INR", min=0),
+            CREATININE,
+        ),
+        [Output("meld", "MELD Score", fmt=".0f")],
+    ),
+    Calculator("APRI", None),
+
+    # ---------- CRITICAL CARE ----------
+    Calculator(
+        "SOFA", None,
+        notes="SOFA Score requires multiple organ parameters: PaO2/FiO2, Platelets, Bilirubin, MAP, GCS, "
+              "Creatinine. Assign 0-4 points per organ system and sum them.",
+    ),
+    Calculator(
+        "APACHE II", None,
+        notes="APACHE II requires age, vitals, lab values, and chronic health status. "
+              "Sum the points to get the APACHE II score.",
+    ),
+    Calculator(
+        "SIRS", sirs,
+        (
+            Input("temperature", "Temperature", "°C"),
+            Input("heart_rate", "Heart rate", "bpm", min=0),
+            Input("rr", "Respiratory rate", "/min", min=0),
+            Input("wbc", "WBC count", "x10⁹/L", min=0),
+        ),
+        [Output("criteria", "SIRS Criteria Met", bands=(
+            Band("warning", "≥2 criteria: SIRS", ge=2),
+        ))],
+    ),
+
+    # ---------- OBSTETRICS ----------
+    Calculator(
+        "Gestational Age", gestational_age,
+        (Input("lmp", "Last Menstrual Period (LMP)", kind="date", default=_today), REF_DATE),
+        [Output("ga_days", "Estimated Gestational Age", fmt=weeks_days)],
+    ),
+    Calculator(
+        "EDC Calculator", edd_estimate,
+        (
+            Input("method", "Calculation method", kind="choice", options=DATING_METHODS, default=DATING_METHODS[0]),
+            Input("lmp", "Date of Last Menstrual Period (LMP)", kind="date", default=_weeks_ago(12),
+                  when=("method", DATING_METHODS[0])),
+            Input("cycle_len", "Average menstrual cycle length", "days", kind="integer", default=28, min=21, max=45,
+                  when=("method", DATING_METHODS[0])),
+            Input("conception", "Conception date", kind="date", default=_weeks_ago(10),
+                  when=("method", DATING_METHODS[1])),
+            Input("scan_date", "Ultrasound date", kind="date", default=_weeks_ago(12),
+                  when=("method", DATING_METHODS[2])),
+            Input("scan_weeks", "Gestational age on ultrasound — weeks", kind="integer", default=12, min=0, max=45,
+                  when=("method", DATING_METHODS[2])),
+            Input("scan_days", "Gestational age on ultrasound — extra days", kind="integer", default=0, min=0, max=6,
+                  when=("method", DATING_METHODS[2])),
+            REF_DATE,
+        ),
+        [
+            Output("edd", "Estimated Date of Delivery (EDD)", fmt=DATE_FORMAT),
+            Output("ga_days", "Gestational age", fmt=weeks_days),
+        ],
+        title="⚕️ EDC / EDD Calculator",
+        notes="**Quick references**\n"
+              "- Naegele's rule (LMP): **LMP + 280 days (40 weeks)**. Adjust by (cycle length − 28) days.\n"
+              "- Conception method: **conception + 266 days (~38 weeks from conception)**; gestational age "
+              "counts from ~2 weeks before conception.\n"
+              "- Ultrasound: EDD = scan date + (280 days − GA at scan). Preferred when LMP is unknown or "
+              "cycles are irregular, especially in the 1st trimester.\n\n"
+              "Note: This tool provides estimates. Always corroborate with clinical judgement and local guidelines.",
+        summary=True,
+    ),
+    Calculator(
+        "EDC to GA", ga_from_edd,
+        (
+            Input("edd", "Estimated Date of Delivery (EDC / EDD)", kind="date",
+                  default=lambda: date.today() + timedelta(weeks=20)),
+            REF_DATE,
+        ),
+        [
+            Output("days_until_edd", "Days until EDD", fmt="d", bands=(
+                Band("warning", "EDD is today.", eq=0),
+                Band("error", "EDD has passed (overdue).", lt=0),
+            )),
+            Output("ga_days", "Estimated Gestational Age", fmt=weeks_days, bands=(
+                Band("info", "Reference date is before pregnancy dating.", lt=0),
+                Band("warning", "⚠️ Post-term (≥42 weeks). Consider clinical assessment.", ge=294),
+                Band("info", "Note: Term (>40 weeks) — monitor for labour and follow local guidelines.", gt=280),
+            )),
+            Output("trimester", "Trimester"),
+            Output("conception_date", "Estimated conception date (≈ EDD − 266 days)", fmt=DATE_FORMAT),
+            Output("progress", "Progress toward 40 weeks", "%", ".1f"),
+        ],
+        title="⚕️ EDC → Gestational Age (GA) Calculator",
+        notes="Estimates only — always confirm with clinical judgement and local guidance "
+              "(ultrasound dating preferred for accuracy).",
+        summary=True,
+    ),
+    Calculator(
+        "Bishop Score", bishop_score,
+        (
+            Input("dilation", "Cervical dilation", "cm", kind="integer", default=0, min=0),
+            Input("effacement", "Effacement", "%", kind="integer", default=0, min=0, max=100),
+            Input("station", "Fetal station (-3 to +3)", kind="integer", default=-3, min=-3, max=3),
+            Input("consistency", "Cervical consistency", kind="choice", options=CONSISTENCY_OPTIONS, default="Firm"),
+            Input("position", "Cervical position", kind="choice", options=POSITION_OPTIONS, default="Posterior"),
+        ),
+        [Output("score", "Bishop Score")],
+    ),
+    Calculator(
+        "BMI in Pregnancy", bmi, (WEIGHT, HEIGHT),
+        [Output("bmi", "BMI", "kg/m²", ".2f", BMI_BANDS)],
+    ),
+
+    # ---------- SURGERY ----------
+    Calculator(
+        "ABPI", abpi,
+        (
+            Input("brachial_right", "Right Brachial Pressure", "mmHg", min=0, required=False),
+            Input("brachial_left", "Left Brachial Pressure", "mmHg", min=0, required=False),
+            Input("ankle_right", "Right Ankle Pressure", "mmHg", min=0, required=False),
+            Input("ankle_left", "Left Ankle Pressure", "mmHg", min=0, required=False),
+        ),
+        [
+            Output("right", "Right Leg ABPI", fmt=".2f", bands=ABPI_BANDS),
+            Output("left", "Left Leg ABPI", fmt=".2f", bands=ABPI_BANDS),
+        ],
+        title="Ankle-Brachial Pressure Index (ABPI) Calculator",
+        notes="The **ABPI** is the **highest ankle systolic pressure** divided by the **highest brachial "
+              "systolic pressure**, used to screen for **Peripheral Arterial Disease (PAD)**.\n\n"
+              "| **ABPI Value** | **Interpretation** |\n"
+              "|---|---|\n"
+              "| > 1.3 | Arterial calcification / non-compressible vessels |\n"
+              "| 0.91 – 1.30 | Normal |\n"
+              "| 0.80 – 0.90 | Mild PAD |\n"
+              "| 0.50 – 0.79 | Moderate PAD |\n"
+              "| < 0.50 | Severe PAD |",
+        confirm="Calculate ABPI",
+    ),
+)
+
+# Name -> the one definition
+CALCULATORS = {calc.name: calc for calc in REGISTRY}
+
+
+# ------------------ CALCULATOR CATALOG ------------------
+# Calculators shown in the Calculator page, grouped by specialty. Shared by
+# the sidebar navigation and the global search. A name may appear in several
+# categories; it always resolves to the same CALCULATORS entry.
+
+CALCULATORS_BY_CATEGORY = {
+    "General": ["BMI", "BSA", "Ideal Body Weight", "Body Fat %", "Creatinine Clearance", "MAP"],
+    "Cardiology": ["CHA2DS2-VASc", "HAS-BLED", "Heart Rate", "Framingham Risk", "TIMI Risk", "GRACE Score", "eGFR"],
+    "Pulmonology": ["Wells Score PE", "CURB-65", "PaO2/FiO2", "Predicted PFT"],
+    "Nephrology": ["eGFR", "Creatinine Clearance", "Urine Output", "FeNa"],
+    "Endocrinology": ["HbA1c to Avg Glucose", "HOMA-IR", "Total Daily Insulin Requirement", "Corrected Calcium", "Corrected Sodium", "Calcium-Phosphate Product", "FRAX", "Serum Osmolality", "Water Deficit", "Anion Gap"],
+    "Mental Health": ["GAD-7", "PHQ-9", "MMSE"],
+    "Hematology": ["INR", "NLR", "PLR", "APTT Ratio", "PT Ratio"],
+    "Gastroenterology": ["Child-Pugh", "MELD", "APRI"],
+    "Critical Care": ["SOFA", "APACHE II", "SIRS"],
+    "Obstetrics": ["Gestational Age", "EDC Calculator", "EDC to GA", "Bishop Score", "BMI in Pregnancy"],
+    "Surgery": ["ABPI"],
+}
+
+# Flattened list for the "All" category, each calculator once (built once, not per rerun)
+ALL_CALCULATORS = tuple(dict.fromkeys(calc for calcs in CALCULATORS_BY_CATEGORY.values() for calc in calcs))
+
+# Name -> every category it is listed under
+CATEGORIES = {
+    calc: tuple(category for category, calcs in CALCULATORS_BY_CATEGORY.items() if calc in calcs)
+    for calc in ALL_CALCULATORS
+}
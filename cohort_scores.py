@@ -0,0 +1,268 @@
+import argparse
+import csv
+import io
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+
+import batch_calculators
+import calculators
+from compile_ddi import line_batches
+
+# ------------------ COHORT SCORING ------------------
+# Nightly scoring of a patient CSV with the registry calculators:
+#
+#     python cohort_scores.py patients.csv --out scores.csv \
+#         --map creatinine=scr_mg_dl --map age=age_years \
+#         --recode sex:M=Male --recode sex:F=Female --keep patient_id
+#
+# Each requested calculator (default: eGFR, CHA2DS2-VASc, HAS-BLED, CURB-65,
+# Child-Pugh, MELD, Wells Score PE) reads its inputs from the CSV column of
+# the same name unless --map says otherwise; "MELD.creatinine=cr" maps an
+# input for one calculator only. Missing or invalid values leave that score
+# blank, exactly as batch_calculators.score() gives NaN. Unmapped inputs
+# with a declared default (risk-factor checkboxes default to "absent") use
+# it, with a warning.
+#
+# The input is streamed in line batches to a process pool, at most two
+# batches per worker in flight, so memory does not depend on file size.
+# Workers score a batch column-wise with the vectorized kernels and return
+# it as CSV text; the parent writes batches in input order. Throughput and
+# peak resident memory (parent and largest worker) go to stderr.
+
+DEFAULT_SCORES = ("eGFR", "CHA2DS2-VASc", "HAS-BLED", "CURB-65", "Child-Pugh", "MELD", "Wells Score PE")
+
+_options = None
+
+
+def _init_worker(options):
+    global _options
+    _options = options
+
+
+def output_columns(calc, interpret=False):
+    """[(header, output, True for its interpretation column)] for a calculator."""
+    columns = []
+    for output in calc.outputs:
+        header = calc.name if len(calc.outputs) == 1 else f"{calc.name} {output.label}"
+        columns.append((header, output, False))
+        if interpret and output.bands:
+            columns.append((f"{header} interpretation", output, True))
+    return columns
+
+
+def plan_columns(header, scores, mapping):
+    """
+    {calculator: {input: CSV column index}} plus warnings for inputs that
+    fall back to their default. ValueError if a required input has no column.
+    """
+    index = {name: i for i, name in enumerate(header)}
+    plan = {}
+    warnings = []
+    for name in scores:
+        calc = calculators.CALCULATORS[name]
+        inputs = {}
+        for spec in calc.inputs:
+            column = mapping.get(f"{name}.{spec.name}", mapping.get(spec.name, spec.name))
+            if column in index:
+                inputs[spec.name] = index[column]
+            elif spec.initial() is not None:
+                warnings.append(f"{name}: no column {column!r} for {spec.label}; using {spec.initial()!r}")
+            elif spec.required:
+                raise ValueError(f"{name}: no column {column!r} for {spec.label} (use --map {spec.name}=<column>)")
+        plan[name] = inputs
+    return plan, warnings
+
+
+def _cell(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _band(output, value):
+    if _cell(value) == "":
+        return ""
+    band = output.interpret(value)
+    return band.label if band else ""
+
+
+def _texts(format_value, values):
+    """format_value over an output array, once per distinct value."""
+    if values.dtype == object:
+        return [format_value(value) for value in values.tolist()]
+    distinct, inverse = np.unique(values, return_inverse=True)
+    texts = np.array([format_value(value) for value in distinct.tolist()], dtype=object)
+    return texts[inverse.reshape(-1)].tolist()
+
+
+def _score_batch(lines):
+    """Score a batch of raw CSV lines; returns (rows read, output CSV text)."""
+    rows = list(csv.reader(lines))
+    n = len(rows)
+    width = max(map(len, rows), default=0)
+    if any(len(row) < width for row in rows):
+        rows = [row + [""] * (width - len(row)) for row in rows]
+    fields = list(zip(*rows))
+    columns = [fields[i] if i < width else [""] * n for i in _options["keep"]]
+    for name, inputs in _options["plan"].items():
+        data = {}
+        for input_name, i in inputs.items():
+            values = fields[i] if i < width else [""] * n
+            recode = _options["recode"].get(input_name)
+            if recode:
+                values = [recode.get(value, value) for value in values]
+            data[input_name] = values
+        results = batch_calculators.score(name, data, n)
+        for _, output, band in output_columns(calculators.CALCULATORS[name], _options["interpret"]):
+            values = results[output.name]
+            if band:
+                columns.append(_texts(lambda value: _band(output, value), values))
+            else:
+                columns.append(_texts(_cell, values))
+    lengths = {len(column) for column in columns}
+    if lengths - {n}:
+        raise RuntimeError(f"scored {sorted(lengths)} rows for a batch of {n}")
+    out = io.StringIO()
+    csv.writer(out).writerows(zip(*columns))
+    return n, out.getvalue()
+
+
+def peak_memory():
+    """(parent, largest finished worker) peak resident memory in MB, or None."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return tuple(resource.getrusage(who).ru_maxrss * scale / 2**20
+                 for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+
+
+def stream_scores(source, out, scores=DEFAULT_SCORES, mapping=None, recode=None, keep=(),
+                  interpret=False, workers=None, batch_lines=20000, progress=None, warn=None):
+    """
+    Score a patient CSV across a process pool, writing the result CSV to
+    the text stream out in input order. Returns the number of rows scored.
+    progress, if given, is called with the running row count after every
+    batch; warn with each defaulted-input warning.
+    """
+    workers = workers or os.cpu_count() or 1
+    with open(source, "r", encoding="utf-8", newline="") as f:
+        header = next(csv.reader([f.readline()]))
+        plan, warnings = plan_columns(header, scores, mapping or {})
+        for message in warnings:
+            if warn:
+                warn(message)
+        missing = [column for column in keep if column not in header]
+        if missing:
+            raise ValueError(f"no column {missing[0]!r} to keep")
+        options = {
+            "plan": plan,
+            "recode": recode or {},
+            "keep": [header.index(column) for column in keep],
+            "interpret": interpret,
+        }
+        writer = csv.writer(out)
+        writer.writerow(list(keep) + [
+            name for score in scores for name, _, _ in output_columns(calculators.CALCULATORS[score], interpret)
+        ])
+
+        rows = 0
+
+        def write(result):
+            nonlocal rows
+            seen, text = result
+            rows += seen
+            out.write(text)
+            if progress:
+                progress(rows)
+
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(options,)) as pool:
+            pending = deque()
+            for batch in line_batches(f, "csv", batch_lines):
+                pending.append(pool.submit(_score_batch, batch))
+                if len(pending) >= 2 * workers:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+    return rows
+
+
+def _pair(text, option):
+    key, sep, value = text.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"{option} expects KEY=VALUE, got {text!r}")
+    return key.strip(), value.strip()
+
+
+def main(argv=None):
+    available = [name for name in calculators.ALL_CALCULATORS if calculators.CALCULATORS[name].function is not None]
+    parser = argparse.ArgumentParser(description="Score a patient CSV with the medical calculators.")
+    parser.add_argument("source", help="patient CSV with a header row")
+    parser.add_argument("--out", help="scores CSV (default: stdout)")
+    parser.add_argument("--scores", nargs="+", default=list(DEFAULT_SCORES), choices=available, metavar="NAME",
+                        help=f"calculators to run (default: {', '.join(DEFAULT_SCORES)})")
+    parser.add_argument("--map", action="append", default=[], metavar="INPUT=COLUMN",
+                        type=lambda text: _pair(text, "--map"),
+                        help="read an input from a differently named column (CALCULATOR.INPUT for one calculator)")
+    parser.add_argument("--recode", action="append", default=[], metavar="INPUT:FROM=TO",
+                        help="replace a raw value before parsing, e.g. sex:M=Male")
+    parser.add_argument("--keep", action="append", default=[], metavar="COLUMN",
+                        help="copy a column (e.g. the patient ID) to the output")
+    parser.add_argument("--interpret", action="store_true", help="add the interpretation band for each score")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--batch-lines", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    recode = {}
+    for text in args.recode:
+        name, sep, rule = text.partition(":")
+        if not sep:
+            parser.error(f"--recode expects INPUT:FROM=TO, got {text!r}")
+        raw, value = _pair(rule, "--recode")
+        recode.setdefault(name.strip(), {})[raw] = value
+
+    start = time.perf_counter()
+
+    def progress(rows):
+        elapsed = time.perf_counter() - start
+        print(f"\r{rows:,} rows ({rows / max(elapsed, 1e-9):,.0f}/s)", end="", file=sys.stderr)
+
+    def warn(message):
+        print(f"warning: {message}", file=sys.stderr)
+
+    out = open(args.out, "w", encoding="utf-8", newline="") if args.out else sys.stdout
+    try:
+        rows = stream_scores(
+            args.source, out, args.scores, dict(args.map), recode, args.keep,
+            args.interpret, args.workers, args.batch_lines, progress, warn,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    finally:
+        if args.out:
+            out.close()
+    print(file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    print(f"{rows:,} rows, {len(args.scores)} scores in {elapsed:.1f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/s)", file=sys.stderr)
+    memory = peak_memory()
+    if memory:
+        print(f"peak memory: {memory[0]:,.0f} MB parent, {memory[1]:,.0f} MB largest worker", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import data_layer
+from ddi_index import merge_record, normalize, pair_key
+
+# ------------------ DDI COMPILER ------------------
+# Builds filtered_ddi.json (and optionally the SQLite / mmap indexes) from
+# a large interaction export, keeping only pairs where both drugs are on
+# the NLEM list.
+#
+#     python compile_ddi.py interactions.csv --nlem nlem_2022.json --out-dir . \
+#         --sqlite data/ddi.sqlite --index data/ddi.idx
+#
+# The source (CSV with a header row, or JSONL) is streamed in line batches
+# that worker processes parse and filter; only a bounded number of batches
+# is in flight at once, so memory depends on the NLEM pair count, not on
+# the size of the source.
+#
+# Each pair is stored once in canonical order. When a source has several
+# records for a pair (A->B and B->A, or duplicates), the most severe one
+# wins; records of equal severity have their distinct descriptions joined
+# with " ALSO. ".
+#
+# Malformed lines (not a JSON object, a non-text field, or an NLEM pair
+# with a blank severity) are skipped and counted; the first MAX_REPORTED
+# are printed with their line number so one bad line cannot abort a
+# multi-GB compile. A missing type is stored as null, not guessed.
+
+DEFAULT_COLUMNS = {
+    "drug_a": "drug_a",
+    "drug_b": "drug_b",
+    "type": "type",
+    "severity": "severity",
+    "description": "description",
+}
+
+# Malformed source lines printed per run (the rest are only counted)
+MAX_REPORTED = 10
+
+_nlem = None
+_columns = None
+
+
+def _init_worker(nlem, columns):
+    global _nlem, _columns
+    _nlem = nlem
+    _columns = columns
+
+
+def json_rows(lines, malformed):
+    """(index, object) for each JSONL line; (index, line) of the rest go to malformed."""
+    for i, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if isinstance(row, dict):
+            yield i, row
+        else:
+            malformed.append((i, line))
+
+
+class MalformedLines:
+    """Running count of skipped source lines; the first MAX_REPORTED go to warn."""
+
+    __slots__ = ("unit", "warn", "count")
+
+    def __init__(self, fmt, warn=None):
+        # CSV batches hold whole records, so positions count data rows
+        self.unit = "row" if fmt == "csv" else "line"
+        self.warn = warn
+        self.count = 0
+
+    def add(self, offset, count, samples):
+        """count malformed entries of a batch starting after offset entries; samples are (index, text)."""
+        if self.warn:
+            for i, text in samples[:max(0, MAX_REPORTED - self.count)]:
+                self.warn(f"{self.unit} {offset + i + 1}: skipped malformed entry: {text.strip()[:120]}")
+        self.count += count
+
+
+def _nlem_pair(row):
+    """
+    (pair key, record) for a source row, or None if it is not an NLEM pair.
+    ValueError if an NLEM pair has no severity.
+    """
+    a = normalize(row.get(_columns["drug_a"]) or "")
+    b = normalize(row.get(_columns["drug_b"]) or "")
+    if a == b or a not in _nlem or b not in _nlem:
+        return None
+    severity = (row.get(_columns["severity"]) or "").strip()
+    if not severity:
+        raise ValueError("blank severity")
+    return pair_key(a, b), {
+        "type": (row.get(_columns["type"]) or "").strip() or None,
+        "severity": severity,
+        "description": (row.get(_columns["description"]) or "").strip(),
+    }
+
+
+def _parse_batch(fmt, header, lines):
+    """
+    Parse a batch of raw lines and keep rows where both drugs are on NLEM.
+    Returns (rows read, kept pairs, malformed count, first malformed (index, line)s).
+    """
+    malformed = []
+    if fmt == "csv":
+        rows = enumerate(csv.DictReader(lines, fieldnames=header))
+    else:
+        rows = json_rows(lines, malformed)
+    kept = []
+    seen = 0
+    for i, row in rows:
+        try:
+            item = _nlem_pair(row)
+        except (AttributeError, TypeError, ValueError):
+            # e.g. a JSON number or list where a drug name belongs, or no severity
+            malformed.append((i, lines[i]))
+            continue
+        seen += 1
+        if item is not None:
+            kept.append(item)
+    return seen, kept, len(malformed), malformed[:MAX_REPORTED]
+
+
+def _merge_batch(pairs, result):
+    seen, kept, _, _ = result
+    for key, record in kept:
+        pairs[key] = merge_record(pairs.get(key), record)
+    return seen
+
+
+def line_batches(f, fmt, batch_lines):
+    """Yield lists of raw lines; CSV records spanning lines are kept whole."""
+    batch = []
+    record = ""
+    for line in f:
+        if fmt == "csv":
+            record += line
+            # A CSV record is complete once its quotes are balanced
+            if record.count('"') % 2:
+                continue
+            line, record = record, ""
+        batch.append(line)
+        if len(batch) >= batch_lines:
+            yield batch
+            batch = []
+    if record:
+        batch.append(record)
+    if batch:
+        yield batch
+
+
+def stream_pairs(source, nlem, columns=None, workers=None, batch_lines=20000, progress=None, warn=None):
+    """
+    Stream-parse a CSV/JSONL source across a process pool.
+
+    Returns ({pair_key: record}, rows_read, malformed lines skipped).
+    progress, if given, is called with the running row count after every
+    batch; warn with the first MAX_REPORTED malformed lines.
+    """
+    columns = dict(DEFAULT_COLUMNS, **(columns or {}))
+    fmt = "jsonl" if source.endswith((".jsonl", ".ndjson")) else "csv"
+    nlem_set = frozenset(normalize(d) for d in nlem)
+    workers = workers or os.cpu_count() or 1
+    pairs = {}
+    rows_read = 0
+    malformed = MalformedLines(fmt, warn)
+    offset = 0
+
+    def merge(batch_offset, result):
+        nonlocal rows_read
+        rows_read += _merge_batch(pairs, result)
+        malformed.add(batch_offset, result[2], result[3])
+        if progress:
+            progress(rows_read)
+
+    with open(source, "r", encoding="utf-8", newline="") as f:
+        header = next(csv.reader([f.readline()])) if fmt == "csv" else None
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(nlem_set, columns)) as pool:
+            # Results are merged in source order (so merges are deterministic)
+            # with at most two batches per worker in flight.
+            pending = deque()
+            for batch in line_batches(f, fmt, batch_lines):
+                pending.append((offset, pool.submit(_parse_batch, fmt, header, batch)))
+                offset += len(batch)
+                if len(pending) >= 2 * workers:
+                    batch_offset, future = pending.popleft()
+                    merge(batch_offset, future.result())
+            while pending:
+                batch_offset, future = pending.popleft()
+                merge(batch_offset, future.result())
+    return pairs, rows_read, malformed.count
+
+
+def to_nested(pairs, nlem):
+    """Nest canonical pairs as filtered_ddi.json, keyed by NLEM display names in NLEM order."""
+    order = {}
+    display = {}
+    for i, name in enumerate(nlem):
+        order.setdefault(normalize(name), i)
+        display.setdefault(normalize(name), name.strip())
+    nested = {}
+    for a, b in sorted(pairs, key=lambda k: (order[k[0]], order[k[1]])):
+        first, second = (a, b) if order[a] <= order[b] else (b, a)
+        nested.setdefault(display[first], {})[display[second]] = pairs[(a, b)]
+    return nested
+
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile filtered_ddi.json from a large DDI export.")
+    parser.add_argument("source", help="CSV (with header) or JSONL interaction export")
+    parser.add_argument("--nlem", default="nlem_2022.json", help="NLEM drug list (JSON array)")
+    parser.add_argument("--out-dir", default=".", help="directory for filtered_ddi.json / nlem_2022.json")
+    parser.add_argument("--sqlite", help="also build a SQLite store at this path")
+    parser.add_argument("--index", help="also build a memory-mapped index at this path")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--batch-lines", type=int, default=20000)
+    for field, default in DEFAULT_COLUMNS.items():
+        parser.add_argument(f"--col-{field.replace('_', '-')}", dest=f"col_{field}", default=default,
+                            help=f"source column for {field} (default: {default})")
+    args = parser.parse_args(argv)
+
+    nlem = data_layer.read_json(args.nlem)
+    columns = {field: getattr(args, f"col_{field}") for field in DEFAULT_COLUMNS}
+    start = time.perf_counter()
+
+    def progress(rows):
+        print(f"\r{rows:,} rows read", end="", file=sys.stderr)
+
+    def warn(message):
+        print(f"\nwarning: {message}", file=sys.stderr)
+
+    pairs, rows_read, skipped = stream_pairs(args.source, nlem, columns, args.workers, args.batch_lines, progress, warn)
+    print(file=sys.stderr)
+    if skipped:
+        print(f"{skipped:,} malformed lines skipped", file=sys.stderr)
+    nested = to_nested(pairs, nlem)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    _write_json(os.path.join(args.out_dir, "filtered_ddi.json"), nested)
+    _write_json(os.path.join(args.out_dir, "nlem_2022.json"), nlem)
+    if args.sqlite:
+        import ddi_sqlite
+        ddi_sqlite.build_sqlite(nested, args.sqlite)
+    if args.index:
+        import ddi_mmap
+        ddi_mmap.compile_index(nested, args.index)
+
+    elapsed = time.perf_counter() - start
+    print(f"{rows_read:,} rows -> {len(pairs):,} NLEM pairs in {elapsed:.1f}s "
+          f"({rows_read / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
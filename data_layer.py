@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# ------------------ DATA LAYER ------------------
+# Process-wide cache for the app's data files (JSON, HTML snippets and
+# anything derived from them). Every Streamlit session in the process
+# shares the same objects, so a rerun does no file I/O and no parsing.
+#
+# Values handed out by load() are shared between sessions: treat them as
+# read-only.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# How often (seconds) a cached file is re-stat'ed to pick up edits.
+RELOAD_CHECK_INTERVAL = 2.0
+
+_cache = {}
+_lock = threading.Lock()
+
+# Values derived from several cached objects (see derived()), least
+# recently used first. A store and its tenants take about 8 entries each.
+_derived = OrderedDict()
+_derived_lock = threading.RLock()
+_MAX_DERIVED = 256
+
+
+class _Entry:
+    __slots__ = ("stamp", "digest", "value", "checked_at")
+
+    def __init__(self, stamp, digest, value, checked_at):
+        self.stamp = stamp
+        self.digest = digest
+        self.value = value
+        self.checked_at = checked_at
+
+
+def asset_path(name):
+    """Resolve a data file name relative to the app directory."""
+    return name if os.path.isabs(name) else os.path.join(BASE_DIR, name)
+
+
+def read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_text(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _digest(path):
+    # Imported here: one-shot tools (ddi_check) never hash and start faster without it
+    import hashlib
+
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _key(name, loader):
+    return (name, loader.__module__, loader.__qualname__)
+
+
+def load(name, loader=read_json, content_hash=True):
+    """
+    Return loader(path) for a data file, computed once per process.
+
+    The file is re-stat'ed at most every RELOAD_CHECK_INTERVAL seconds. When
+    its mtime/size changed and its content hash differs, the loader is run
+    again and the new value replaces the old one in a single assignment, so
+    concurrent readers see either the old or the new version, never a mix.
+    Different loaders for the same file are cached independently. Loaders
+    are identified by module and name rather than identity, so a function
+    re-defined by a Streamlit rerun still hits the cache (use named
+    functions, not lambdas).
+
+    With content_hash=False the mtime/size stamp alone decides: for large
+    binary files (SQLite databases, mmap indexes) that are opened rather
+    than read, hashing every byte at startup and on each touch costs more
+    than an occasional needless reopen.
+    """
+    key = _key(name, loader)
+    now = time.monotonic()
+    entry = _cache.get(key)
+    if entry is not None and now - entry.checked_at < RELOAD_CHECK_INTERVAL:
+        return entry.value
+
+    path = asset_path(name)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and now - entry.checked_at < RELOAD_CHECK_INTERVAL:
+            return entry.value
+
+        stamp = _stamp(path)
+        if entry is not None and entry.stamp == stamp:
+            entry.checked_at = now
+            return entry.value
+
+        digest = _digest(path) if content_hash else "%x-%x" % stamp
+        if entry is not None and entry.digest == digest:
+            # Touched but not modified
+            entry.stamp = stamp
+            entry.checked_at = now
+            return entry.value
+
+        value = loader(path)
+        _cache[key] = _Entry(stamp, digest, value, now)
+        return value
+
+
+def version(name, loader=read_json, content_hash=True):
+    """Content hash (or mtime/size stamp) of the currently cached version of a data file."""
+    load(name, loader, content_hash)
+    return _cache[_key(name, loader)].digest
+
+
+def _drop_dependents(value):
+    """Drop every derived entry built from value, and theirs in turn (caller holds _derived_lock)."""
+    stale = [value]
+    while stale:
+        value = stale.pop()
+        for key, (inputs, _) in list(_derived.items()):
+            if any(item is value for item in inputs):
+                stale.append(_derived.pop(key)[1])
+
+
+def derived(key, build, *inputs):
+    """
+    Return build(*inputs), cached under key until one of the inputs is
+    replaced by a reload (inputs are compared by identity).
+
+    Used for indexes layered on top of several loaded files, e.g. a
+    tenant overlay on top of the shared interaction store. When an entry
+    is rebuilt or evicted, the entries derived from its old value go with
+    it, so indexes over an old store version (keyed by id(store)) do not
+    linger. Past _MAX_DERIVED entries, the least recently used is evicted.
+    """
+    def current(entry):
+        return entry is not None and len(entry[0]) == len(inputs) and all(a is b for a, b in zip(entry[0], inputs))
+
+    entry = _derived.get(key)
+    if current(entry):
+        try:
+            _derived.move_to_end(key)
+        except KeyError:
+            # Evicted by another thread meanwhile; the value is still valid
+            pass
+        return entry[1]
+    with _derived_lock:
+        # Another thread may have built it while we waited
+        entry = _derived.get(key)
+        if current(entry):
+            _derived.move_to_end(key)
+            return entry[1]
+        value = build(*inputs)
+        if key in _derived:
+            _drop_dependents(_derived.pop(key)[1])
+        _derived[key] = (inputs, value)
+        while len(_derived) > _MAX_DERIVED:
+            _drop_dependents(_derived.popitem(last=False)[1][1])
+        return value
+
+
+def clear():
+    """Drop every cached value (next load() re-reads from disk)."""
+    with _lock:
+        _cache.clear()
+    with _derived_lock:
+        _derived.clear()
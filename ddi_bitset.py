@@ -0,0 +1,121 @@
+import data_layer
+from ddi_compact import CompactInteractionIndex
+from ddi_index import SEVERITY_LEVELS, InteractionIndex, normalize, pair_key, severity_rank
+
+# ------------------ SEVERITY BITSETS ------------------
+# Per drug and per severity tier, a bitset (Python int) of the drugs it
+# interacts with at exactly that tier. Whole-regimen questions ("is anything
+# contraindicated?", "what is the worst interaction?") become one AND per
+# regimen drug against the regimen's own bitset, highest tier first, with
+# no per-pair record lookups or severity string comparisons.
+#
+# Built once per store (data version / tenant) from interactions_among()
+# over every drug, so it works on top of any backend, rules and overlays
+# included. Memory is about tiers x drugs^2 bits: meant for formulary-sized
+# stores (a few thousand drugs), not for whole drug databases.
+#
+# Only built over in-memory backends (dict, compact). Reading every pair out
+# of SQLite or the mapped index would defeat their point (flat memory,
+# nothing built per worker), so get_bitsets() returns None for them and
+# callers work from the regimen's own pairs instead.
+
+# Tiers from most to least severe ("no interaction" gets no bitset)
+TIERS = sorted((rank for rank in set(SEVERITY_LEVELS.values()) if rank > 0), reverse=True)
+
+# Severity name for each rank, for display
+TIER_NAMES = {rank: name for name, rank in SEVERITY_LEVELS.items()}
+
+
+class SeverityBitsets:
+    """
+    Adjacency bitsets per severity tier over a store's drugs, plus known:
+    per drug, the drugs it has any record with ("no interaction" included).
+    """
+
+    __slots__ = ("drugs", "ids", "adjacency", "known")
+
+    def __init__(self, store):
+        self.drugs = tuple(store.drugs)
+        self.ids = {drug: i for i, drug in enumerate(self.drugs)}
+        adjacency = {rank: [0] * len(self.drugs) for rank in TIERS}
+        known = [0] * len(self.drugs)
+        for (a, b), record in store.interactions_among(self.drugs).items():
+            i, j = self.ids[a], self.ids[b]
+            known[i] |= 1 << j
+            known[j] |= 1 << i
+            rank = severity_rank(record["severity"])
+            if rank > 0:
+                tier = adjacency[rank]
+                tier[i] |= 1 << j
+                tier[j] |= 1 << i
+        self.adjacency = adjacency
+        self.known = known
+
+    def regimen_ids(self, drugs):
+        """Store IDs of the known drugs in a list (unknown drugs are skipped)."""
+        ids = []
+        for drug in drugs:
+            i = self.ids.get(normalize(drug))
+            if i is not None:
+                ids.append(i)
+        return ids
+
+    def max_severity(self, drugs):
+        """Highest severity rank among all pairs of the regimen (0 if none)."""
+        ids = self.regimen_ids(drugs)
+        mask = 0
+        for i in ids:
+            mask |= 1 << i
+        for rank in TIERS:
+            tier = self.adjacency[rank]
+            for i in ids:
+                if tier[i] & mask:
+                    return rank
+        return 0
+
+    def has_severity(self, drugs, severity):
+        """True if any pair in the regimen is at least as severe as severity."""
+        return self.max_severity(drugs) >= severity_rank(severity)
+
+    def pairs_at(self, drugs, rank):
+        """Pair keys of the regimen's interactions at exactly one tier."""
+        ids = sorted(set(self.regimen_ids(drugs)))
+        tier = self.adjacency[rank]
+        pairs = []
+        for n, i in enumerate(ids):
+            row = tier[i]
+            if not row:
+                continue
+            for j in ids[n + 1:]:
+                if row >> j & 1:
+                    pairs.append(pair_key(self.drugs[i], self.drugs[j]))
+        return pairs
+
+    def counts(self, drugs):
+        """{rank: number of pairs} for the tiers present in the regimen."""
+        ids = self.regimen_ids(drugs)
+        mask = 0
+        for i in ids:
+            mask |= 1 << i
+        counts = {}
+        for rank in TIERS:
+            tier = self.adjacency[rank]
+            # Every pair is seen from both ends
+            total = sum(bin(tier[i] & mask).count("1") for i in set(ids)) // 2
+            if total:
+                counts[rank] = total
+        return counts
+
+
+def in_memory(store):
+    """True if the backend under any rule/overlay layers holds every pair in memory."""
+    while hasattr(store, "base"):
+        store = store.base
+    return isinstance(store, (InteractionIndex, CompactInteractionIndex))
+
+
+def get_bitsets(store):
+    """Severity bitsets for a store, cached per store version; None unless in_memory(store)."""
+    if not in_memory(store):
+        return None
+    return data_layer.derived(("bitsets", id(store)), SeverityBitsets, store)
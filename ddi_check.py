@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import sys
+
+import data_layer
+import ddi_index
+import ddi_overlay
+import ddi_rules
+import drug_aliases
+import regimen
+from ddi_index import normalize, severity_rank
+
+# ------------------ ONE-SHOT INTERACTION CHECK ------------------
+# Command-line interaction report over the same data as the Drug Assistant,
+# for scripts and EHR pipelines:
+#
+#     python ddi_check.py warfarin "Dolo 650" ibuprofen --egfr 25
+#     python ddi_check.py --json --fail-on "serious - use alternative" aspirin ibuprofen
+#     cut -d, -f2 regimens.csv | python ddi_check.py --stdin --json
+#
+# Built for start-up time: nothing outside the standard library is
+# imported (so `python -S` works), and the shared data_layer cache is
+# bypassed because a single run gains nothing from it. When the compiled
+# snapshot (ddi_mmap, data/ddi.idx) is at least as new as filtered_ddi.json
+# it is mapped instead of parsing the JSON; build it with
+#
+#     python ddi_mmap.py filtered_ddi.json data/ddi.idx
+#
+# An explicit DDI_BACKEND / DDI_SQLITE_PATH is honoured as in the app.
+# --stdin checks one comma-separated regimen per line in a single process,
+# for loops that would otherwise start the interpreter per regimen.
+
+SOURCE_FILE = "filtered_ddi.json"
+DEFAULT_INDEX = os.environ.get("DDI_INDEX_PATH", "data/ddi.idx")
+
+SEVERITY_ICONS = {0: "✅", 1: "ℹ️", 2: "🟠", 3: "❌", 4: "❌"}
+
+
+def open_store(tenant=None, index_path=DEFAULT_INDEX, use_index=True):
+    """Interaction store (base + rules + tenant overlay) without the shared cache."""
+    if os.environ.get("DDI_BACKEND") or os.environ.get("DDI_SQLITE_PATH"):
+        return ddi_overlay.get_store(tenant)
+    source = data_layer.asset_path(SOURCE_FILE)
+    index = data_layer.asset_path(index_path)
+    if use_index and os.path.exists(index) and os.stat(index).st_mtime_ns >= os.stat(source).st_mtime_ns:
+        import ddi_mmap
+        base = ddi_mmap.MmapInteractionIndex(index)
+    else:
+        base = ddi_index.load_interaction_index(source)
+    store = ddi_rules.InferredInteractionStore(
+        base, ddi_rules.load_rules(data_layer.asset_path(ddi_rules.CLASSES_FILE))
+    )
+    overlay = ddi_overlay.find_overlay(tenant)
+    if overlay is not None:
+        store = ddi_overlay.LayeredInteractionStore(
+            store, ddi_overlay.load_overlay(data_layer.asset_path(overlay))
+        )
+    return store
+
+
+def resolve(name, store, aliases):
+    """Drug ID for a generic, brand or salt name, or None if unknown."""
+    drug = normalize(name)
+    if drug in store:
+        return drug
+    key = aliases.key(name)
+    if key in store:
+        return key
+    drug = aliases.canonical.get(key)
+    return drug if drug is not None and drug in store else None
+
+
+def check(names, store, aliases, attributes, patient, cache=None):
+    """(report, unknown names) for a list of names as typed."""
+    drugs = []
+    unknown = []
+    for name in names:
+        if not name.strip():
+            continue
+        drug = resolve(name, store, aliases)
+        if drug is None:
+            unknown.append(name.strip())
+        elif drug not in drugs:
+            drugs.append(drug)
+    return regimen.check_regimen(drugs, store, attributes, patient, cache), unknown
+
+
+def to_json(report, unknown):
+    return {
+        "drugs": report.drugs,
+        "unknown_drugs": unknown,
+        "interactions": [
+            {"drugs": [d1, d2], "severity": rec["severity"], "type": rec.get("type"), "description": rec.get("description")}
+            for _, d1, d2, rec in report.ranked_pairs()
+        ],
+        "flags": [
+            {"drug": drug, "kind": kind, "level": level, "message": message}
+            for drug, kind, level, message in report.flags
+        ],
+    }
+
+
+def print_text(report, unknown, out):
+    for name in unknown:
+        print(f"? {name}: not found", file=out)
+    for drug, kind, _, message in report.flags:
+        print(f"! {drug} ({kind}): {message}", file=out)
+    rows = report.ranked_pairs()
+    for rank, d1, d2, rec in rows:
+        print(f"{SEVERITY_ICONS.get(rank, '')} {d1} + {d2} → {rec['severity'].capitalize()}: {rec['description']}", file=out)
+    if len(report.drugs) > 1 and not rows:
+        print("✅ No major interactions found.", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check a drug list for interactions.")
+    parser.add_argument("drugs", nargs="*", help="generic or brand names")
+    parser.add_argument("--stdin", action="store_true", help="read one comma-separated regimen per line")
+    parser.add_argument("--json", action="store_true", help="print JSON (one object per regimen)")
+    parser.add_argument("--tenant", default=os.environ.get("DDI_TENANT"), help="hospital overlay to apply")
+    parser.add_argument("--index", default=DEFAULT_INDEX, help="compiled ddi_mmap snapshot to use when fresh")
+    parser.add_argument("--no-index", action="store_true", help="always parse filtered_ddi.json")
+    parser.add_argument("--fail-on", choices=[s for s, rank in ddi_index.SEVERITY_LEVELS.items() if rank > 0],
+                        help="exit with status 1 if any pair is at least this severe")
+    parser.add_argument("--egfr", type=float, help="patient eGFR (mL/min/1.73m²)")
+    parser.add_argument("--pregnant", action="store_true")
+    parser.add_argument("--hepatic", action="store_true", help="hepatic impairment")
+    args = parser.parse_args(argv)
+    if not args.drugs and not args.stdin:
+        parser.error("give drug names or --stdin")
+
+    store = open_store(args.tenant, args.index, not args.no_index)
+    aliases = drug_aliases.AliasIndex(data_layer.read_json(data_layer.asset_path(drug_aliases.ALIASES_FILE)))
+    attributes = regimen.load_attributes(data_layer.asset_path(regimen.ATTRIBUTES_FILE))
+    patient = regimen.Patient(args.egfr, args.pregnant, args.hepatic)
+    fail_rank = severity_rank(args.fail_on) if args.fail_on else None
+
+    regimens = (line.split(",") for line in sys.stdin) if args.stdin else [args.drugs]
+    failed = False
+    for names in regimens:
+        report, unknown = check(names, store, aliases, attributes, patient)
+        if args.json:
+            print(json.dumps(to_json(report, unknown), ensure_ascii=False))
+        else:
+            print_text(report, unknown, sys.stdout)
+            if args.stdin:
+                print()
+        if fail_rank is not None and any(rank >= fail_rank for rank, _, _, _ in report.ranked_pairs()):
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+from array import array
+
+import data_layer
+from ddi_index import merge_record, normalize, pair_key
+
+# ------------------ COMPACT INTERACTION MATRIX ------------------
+# Memory-lean alternative to ddi_index.InteractionIndex. Drugs get integer
+# IDs (position in the sorted name list) and every unordered pair i < j
+# owns one slot in two flat triangular arrays:
+#
+#   kinds[slot]  -> code into a small table of (type, severity) tuples
+#                   (0 means "no data for this pair")
+#   descs[slot]  -> code into a deduplicated description table
+#
+# Templated descriptions ("NO Potential interaction between X and Y.") are
+# stored once as a format string and filled in with the drug names when a
+# pair is looked up.
+
+TEMPLATES = (
+    "NO Potential interaction between {a} and {b}.",
+    "Potential interaction between {a} and {b}.",
+)
+
+
+def tri_slot(i, j):
+    """Slot of pair (i, j), i < j, in a row-major lower-triangular array."""
+    return j * (j - 1) // 2 + i
+
+
+def _escape(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def _description_template(text, a, b):
+    """Format string reproducing text for display names a, b (a sorts first)."""
+    for template in TEMPLATES:
+        if text == template.format(a=a, b=b):
+            return template
+        if text == template.format(a=b, b=a):
+            return template.replace("{a}", "{x}").replace("{b}", "{a}").replace("{x}", "{b}")
+    return _escape(text)
+
+
+class CompactInteractionIndex:
+    """Triangular severity matrix with interned type/severity and description tables."""
+
+    __slots__ = ("drugs", "drug_set", "display", "ids", "kinds", "descs", "kind_table", "desc_table", "count")
+
+    def __init__(self, ddi_data):
+        display = {}
+        records = {}
+        for d1, interactions in ddi_data.items():
+            display.setdefault(normalize(d1), d1.strip())
+            for d2, interaction in interactions.items():
+                display.setdefault(normalize(d2), d2.strip())
+                key = pair_key(normalize(d1), normalize(d2))
+                records[key] = merge_record(records.get(key), interaction)
+
+        self.drugs = tuple(sorted(display))
+        self.drug_set = frozenset(self.drugs)
+        self.display = tuple(display[d] for d in self.drugs)
+        self.ids = {name: i for i, name in enumerate(self.drugs)}
+
+        kind_codes = {}
+        desc_codes = {}
+        n = len(self.drugs)
+        size = n * (n - 1) // 2
+        kinds = array("B", bytes(size))
+        slot_descs = {}
+        for (a, b), interaction in records.items():
+            i, j = self.ids[a], self.ids[b]
+            if i == j:
+                continue
+            kind = (interaction.get("type"), interaction["severity"])
+            code = kind_codes.setdefault(kind, len(kind_codes) + 1)
+            if code > 255:
+                raise ValueError(f"Too many distinct type/severity combinations ({code})")
+            kinds[tri_slot(i, j)] = code
+            text = _description_template(interaction.get("description") or "", self.display[i], self.display[j])
+            slot_descs[tri_slot(i, j)] = desc_codes.setdefault(text, len(desc_codes))
+
+        typecode = "H" if len(desc_codes) <= 0xFFFF else "I"
+        descs = array(typecode, bytes(size * array(typecode).itemsize))
+        for slot, code in slot_descs.items():
+            descs[slot] = code
+
+        self.kinds = kinds
+        self.descs = descs
+        self.kind_table = (None,) + tuple(kind_codes)
+        self.desc_table = tuple(desc_codes)
+        self.count = len(slot_descs)
+
+    def _record(self, i, j):
+        if i > j:
+            i, j = j, i
+        slot = tri_slot(i, j)
+        code = self.kinds[slot]
+        if not code:
+            return None
+        interaction_type, severity = self.kind_table[code]
+        description = self.desc_table[self.descs[slot]].format(a=self.display[i], b=self.display[j])
+        return {"type": interaction_type, "severity": severity, "description": description}
+
+    def severity_code(self, d1, d2):
+        """Raw kind code for a pair (0 when unknown), without building a record."""
+        i, j = self.ids.get(normalize(d1)), self.ids.get(normalize(d2))
+        if i is None or j is None or i == j:
+            return 0
+        return self.kinds[tri_slot(min(i, j), max(i, j))]
+
+    def get(self, d1, d2):
+        """Interaction record for two drug names, or None."""
+        i, j = self.ids.get(normalize(d1)), self.ids.get(normalize(d2))
+        if i is None or j is None or i == j:
+            return None
+        return self._record(i, j)
+
+    def interactions_among(self, drugs):
+        """All known pairs within a list of drugs, as {pair_key: record}."""
+        ids = sorted({self.ids[n] for n in (normalize(d) for d in drugs) if n in self.ids})
+        result = {}
+        for x, i in enumerate(ids):
+            for j in ids[x + 1:]:
+                record = self._record(i, j)
+                if record is not None:
+                    result[(self.drugs[i], self.drugs[j])] = record
+        return result
+
+    def __contains__(self, drug):
+        return normalize(drug) in self.drug_set
+
+    def __len__(self):
+        return self.count
+
+
+def load_compact_index(path):
+    return CompactInteractionIndex(data_layer.read_json(path))
+
+
+def get_index(name="filtered_ddi.json"):
+    """Shared compact index for the current version of the DDI file."""
+    return data_layer.load(name, load_compact_index)
@@ -0,0 +1,136 @@
+import os
+from types import MappingProxyType
+
+import data_layer
+
+# ------------------ INTERACTION INDEX ------------------
+# Symmetric, normalized view of filtered_ddi.json. Built once per data
+# version (see data_layer.load) and shared read-only by every session.
+
+# Severity categories used in filtered_ddi.json, least to most severe.
+# Anything unrecognised ranks with "moderate".
+SEVERITY_LEVELS = {
+    "no interaction": 0,
+    "moderate": 1,
+    "monitor closely": 2,
+    "serious - use alternative": 3,
+    "contraindicated": 4,
+}
+
+
+def normalize(name):
+    return name.strip().lower()
+
+
+def severity_rank(severity):
+    return SEVERITY_LEVELS.get(severity.strip().lower(), 1)
+
+
+def pair_key(d1, d2):
+    """Order-independent key for a pair of normalized drug names."""
+    return (d1, d2) if d1 <= d2 else (d2, d1)
+
+
+def merge_record(current, new):
+    """
+    Resolve two records for the same pair: the most severe wins, and equal
+    severities keep both distinct descriptions joined with " ALSO. ".
+    """
+    if current is None:
+        return new
+    rank_cur, rank_new = severity_rank(current["severity"]), severity_rank(new["severity"])
+    if rank_new > rank_cur:
+        return new
+    if rank_new < rank_cur:
+        return current
+    current_desc, new_desc = current.get("description") or "", new.get("description") or ""
+    if not new_desc or new_desc in current_desc:
+        return current
+    if not current_desc:
+        return new
+    return dict(current, description=current_desc + " ALSO. " + new_desc)
+
+
+class InteractionIndex:
+    """Immutable drug-pair lookup built from the nested DDI dict."""
+
+    __slots__ = ("drugs", "drug_set", "pairs")
+
+    def __init__(self, ddi_data):
+        pairs = {}
+        drugs = set()
+        for d1, interactions in ddi_data.items():
+            d1_norm = normalize(d1)
+            drugs.add(d1_norm)
+            for d2, interaction in interactions.items():
+                d2_norm = normalize(d2)
+                drugs.add(d2_norm)
+                # A->B and B->A records are merged rather than overwritten
+                key = pair_key(d1_norm, d2_norm)
+                pairs[key] = merge_record(pairs.get(key), interaction)
+
+        for key, interaction in pairs.items():
+            pairs[key] = MappingProxyType(dict(interaction))
+
+        # Sorted master drug list (normalized names)
+        self.drugs = tuple(sorted(drugs))
+        self.drug_set = frozenset(drugs)
+        self.pairs = MappingProxyType(pairs)
+
+    def get(self, d1, d2):
+        """Interaction record for two drug names, or None. O(1)."""
+        return self.pairs.get(pair_key(normalize(d1), normalize(d2)))
+
+    def interactions_among(self, drugs):
+        """All known pairs within a list of drugs, as {pair_key: record}."""
+        names = sorted({normalize(d) for d in drugs})
+        result = {}
+        for i, a in enumerate(names):
+            for b in names[i + 1:]:
+                interaction = self.pairs.get((a, b))
+                if interaction is not None:
+                    result[(a, b)] = interaction
+        return result
+
+    def __contains__(self, drug):
+        return normalize(drug) in self.drug_set
+
+    def __len__(self):
+        return len(self.pairs)
+
+
+def load_interaction_index(path):
+    return InteractionIndex(data_layer.read_json(path))
+
+
+def get_index(name="filtered_ddi.json"):
+    """Shared index for the current version of the DDI file."""
+    return data_layer.load(name, load_interaction_index)
+
+
+def get_store():
+    """
+    Interaction backend for the app, chosen by the DDI_BACKEND env var.
+
+    - "dict" (default): this module's InteractionIndex over filtered_ddi.json
+    - "compact": ddi_compact's triangular severity matrix over the same file
+    - "sqlite": on-disk store at DDI_SQLITE_PATH (default data/ddi.sqlite)
+    - "mmap": ddi_mmap's compiled index at DDI_INDEX_PATH (default data/ddi.idx)
+
+    Setting only DDI_SQLITE_PATH also selects "sqlite". All backends expose
+    the same lookups (drugs, get, interactions_among).
+    """
+    db_path = os.environ.get("DDI_SQLITE_PATH")
+    backend = os.environ.get("DDI_BACKEND") or ("sqlite" if db_path else "dict")
+    if backend == "sqlite":
+        import ddi_sqlite
+        return ddi_sqlite.get_store(db_path or "data/ddi.sqlite")
+    if backend == "mmap":
+        import ddi_mmap
+        return ddi_mmap.get_index(os.environ.get("DDI_INDEX_PATH", "data/ddi.idx"))
+    if backend == "compact":
+        import ddi_compact
+        return ddi_compact.get_index()
+    if backend == "dict":
+        return get_index()
+    raise ValueError(f"Unknown DDI_BACKEND: {backend!r}")
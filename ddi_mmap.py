@@ -0,0 +1,206 @@
+import bisect
+import mmap
+import os
+import struct
+import sys
+
+import data_layer
+from ddi_compact import CompactInteractionIndex, tri_slot
+from ddi_index import normalize
+
+# ------------------ MEMORY-MAPPED INTERACTION INDEX ------------------
+# Binary, read-only form of ddi_compact.CompactInteractionIndex. Every
+# Streamlit process on a host maps the same file, so the OS page cache
+# holds one copy and a fresh worker answers its first lookup straight from
+# the mapping (drug names are binary-searched in place, nothing is built).
+#
+# Build with:
+#
+#     python ddi_mmap.py filtered_ddi.json data/ddi.idx
+#
+# and select it in the app with DDI_BACKEND=mmap (DDI_INDEX_PATH overrides
+# the default data/ddi.idx). Replace the file rather than rewriting it in
+# place; write_index() does this atomically.
+#
+# Layout (all sections 8-byte aligned, integers in the byte order recorded
+# in the header):
+#
+#   header      magic, format version, byte order, desc item size,
+#               drug/kind/desc/pair counts, section offsets
+#   names       string table of sorted normalized drug names
+#   display     string table of display names (same order)
+#   kind_table  string table of "type<US>severity" entries (code 0 unused)
+#   desc_table  string table of description format strings
+#   kinds       uint8 triangular array of kind codes
+#   descs       uint16/uint32 triangular array of description codes
+#
+# A string table is uint32 offsets[count + 1] followed by a UTF-8 blob.
+
+MAGIC = b"DDIX"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHBBIIII6Q")
+_SEP = "\x1f"
+_BYTEORDER = {"little": 0, "big": 1}
+
+
+def _pad(buf):
+    buf.extend(bytes(-len(buf) % 8))
+
+
+def _write_strings(buf, strings):
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for e in encoded:
+        offsets.append(offsets[-1] + len(e))
+    start = len(buf)
+    buf.extend(struct.pack(f"={len(offsets)}I", *offsets))
+    buf.extend(b"".join(encoded))
+    _pad(buf)
+    return start
+
+
+def write_index(compact, path):
+    """Serialize a CompactInteractionIndex to path (atomic replace)."""
+    buf = bytearray(_HEADER.size)
+    _pad(buf)
+    names_at = _write_strings(buf, compact.drugs)
+    display_at = _write_strings(buf, compact.display)
+    kinds_table_at = _write_strings(
+        buf, [""] + [(t or "") + _SEP + severity for t, severity in compact.kind_table[1:]]
+    )
+    desc_table_at = _write_strings(buf, compact.desc_table)
+    kinds_at = len(buf)
+    buf.extend(compact.kinds.tobytes())
+    _pad(buf)
+    descs_at = len(buf)
+    buf.extend(compact.descs.tobytes())
+
+    buf[:_HEADER.size] = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, _BYTEORDER[sys.byteorder], compact.descs.itemsize,
+        len(compact.drugs), len(compact.kind_table), len(compact.desc_table), len(compact),
+        names_at, display_at, kinds_table_at, desc_table_at, kinds_at, descs_at,
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(buf)
+    os.replace(tmp_path, path)
+
+
+def compile_index(ddi_data, path):
+    write_index(CompactInteractionIndex(ddi_data), path)
+
+
+class _StringTable:
+    """Sequence view over a string table inside the mapping."""
+
+    __slots__ = ("_offsets", "_blob", "_count")
+
+    def __init__(self, view, start, count):
+        self._offsets = view[start:start + 4 * (count + 1)].cast("I")
+        blob_start = start + 4 * (count + 1)
+        self._blob = view[blob_start:blob_start + self._offsets[count]]
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+
+class MmapInteractionIndex:
+    """Read-only interaction lookups served directly from a mapped index file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        (magic, fmt, byteorder, desc_size, n, n_kinds, n_descs, count,
+         names_at, display_at, kinds_table_at, desc_table_at, kinds_at, descs_at) = _HEADER.unpack_from(view)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} DDI index")
+        if byteorder != _BYTEORDER[sys.byteorder]:
+            raise ValueError(f"{path} was compiled on a host with a different byte order")
+
+        size = n * (n - 1) // 2
+        self._names = _StringTable(view, names_at, n)
+        self._display = _StringTable(view, display_at, n)
+        self._kind_table = _StringTable(view, kinds_table_at, n_kinds)
+        self._desc_table = _StringTable(view, desc_table_at, n_descs)
+        self._kinds = view[kinds_at:kinds_at + size]
+        self._descs = view[descs_at:descs_at + size * desc_size].cast("H" if desc_size == 2 else "I")
+        self._count = count
+        self._drugs = None
+        self._drug_set = None
+
+    @property
+    def drugs(self):
+        """Sorted normalized drug names (decoded on first use)."""
+        if self._drugs is None:
+            self._drugs = tuple(self._names[i] for i in range(len(self._names)))
+        return self._drugs
+
+    @property
+    def drug_set(self):
+        if self._drug_set is None:
+            self._drug_set = frozenset(self.drugs)
+        return self._drug_set
+
+    def drug_id(self, drug):
+        """Integer ID of a drug name, or None (binary search in the mapping)."""
+        name = normalize(drug)
+        i = bisect.bisect_left(self._names, name)
+        if i < len(self._names) and self._names[i] == name:
+            return i
+        return None
+
+    def _record(self, i, j):
+        if i > j:
+            i, j = j, i
+        slot = tri_slot(i, j)
+        code = self._kinds[slot]
+        if not code:
+            return None
+        interaction_type, severity = self._kind_table[code].split(_SEP, 1)
+        description = self._desc_table[self._descs[slot]].format(a=self._display[i], b=self._display[j])
+        return {"type": interaction_type or None, "severity": severity, "description": description}
+
+    def get(self, d1, d2):
+        """Interaction record for two drug names, or None."""
+        i, j = self.drug_id(d1), self.drug_id(d2)
+        if i is None or j is None or i == j:
+            return None
+        return self._record(i, j)
+
+    def interactions_among(self, drugs):
+        """All known pairs within a list of drugs, as {pair_key: record}."""
+        ids = sorted({i for i in map(self.drug_id, drugs) if i is not None})
+        result = {}
+        for x, i in enumerate(ids):
+            for j in ids[x + 1:]:
+                record = self._record(i, j)
+                if record is not None:
+                    result[(self._names[i], self._names[j])] = record
+        return result
+
+    def __contains__(self, drug):
+        return self.drug_id(drug) is not None
+
+    def __len__(self):
+        return self._count
+
+
+def get_index(path):
+    """Shared mapping of an index file (remapped when the file is replaced)."""
+    return data_layer.load(path, MmapInteractionIndex, content_hash=False)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python ddi_mmap.py <filtered_ddi.json> <output.idx>")
+    compile_index(data_layer.read_json(sys.argv[1]), sys.argv[2])
+    print(f"Wrote {sys.argv[2]}")
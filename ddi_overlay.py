@@ -0,0 +1,125 @@
+import os
+import re
+from types import MappingProxyType
+
+import data_layer
+import ddi_rules
+from ddi_index import normalize, pair_key
+
+# ------------------ PER-HOSPITAL OVERLAYS ------------------
+# A hospital (tenant) can customise the shared interaction data with a
+# small file overlays/<tenant>.json instead of forking filtered_ddi.json:
+#
+#   {
+#     "formulary": ["Paracetamol", "Warfarin", ...],   # optional allow-list
+#     "hide_drugs": ["Sildenafil"],                      # optional
+#     "interactions": {                                  # same shape as filtered_ddi.json
+#       "Warfarin": {
+#         "Paracetamol": {"type": "...", "severity": "...", "description": "..."},
+#         "Aspirin": null                                # null hides the base pair
+#       }
+#     }
+#   }
+#
+# Lookups check the overlay first and fall through to the shared base
+# store, which is never copied.
+
+OVERLAY_DIR = "overlays"
+_TENANT_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class Overlay:
+    """Parsed overlay file: pair overrides plus drug list restrictions."""
+
+    __slots__ = ("pairs", "added_drugs", "hidden", "formulary")
+
+    def __init__(self, data):
+        pairs = {}
+        added = set()
+        for d1, interactions in data.get("interactions", {}).items():
+            for d2, interaction in interactions.items():
+                a, b = normalize(d1), normalize(d2)
+                pairs[pair_key(a, b)] = None if interaction is None else MappingProxyType(dict(interaction))
+                if interaction is not None:
+                    added.update((a, b))
+        formulary = data.get("formulary")
+        self.pairs = MappingProxyType(pairs)
+        self.added_drugs = frozenset(added)
+        self.hidden = frozenset(normalize(d) for d in data.get("hide_drugs", ()))
+        self.formulary = None if formulary is None else frozenset(normalize(d) for d in formulary)
+
+
+def load_overlay(path):
+    return Overlay(data_layer.read_json(path))
+
+
+class LayeredInteractionStore:
+    """Overlay-first view over a shared base store (same lookups as the base)."""
+
+    def __init__(self, base, overlay):
+        self.base = base
+        self.overlay = overlay
+        drugs = set(base.drugs) | overlay.added_drugs
+        if overlay.formulary is not None:
+            drugs &= overlay.formulary
+        drugs -= overlay.hidden
+        self.drugs = tuple(sorted(drugs))
+        self.drug_set = frozenset(drugs)
+
+    def get(self, d1, d2):
+        a, b = normalize(d1), normalize(d2)
+        if a not in self.drug_set or b not in self.drug_set:
+            return None
+        key = pair_key(a, b)
+        if key in self.overlay.pairs:
+            return self.overlay.pairs[key]
+        return self.base.get(a, b)
+
+    def interactions_among(self, drugs):
+        names = sorted({n for n in map(normalize, drugs) if n in self.drug_set})
+        result = dict(self.base.interactions_among(names))
+        for i, a in enumerate(names):
+            for b in names[i + 1:]:
+                if (a, b) in self.overlay.pairs:
+                    interaction = self.overlay.pairs[(a, b)]
+                    if interaction is None:
+                        result.pop((a, b), None)
+                    else:
+                        result[(a, b)] = interaction
+        return result
+
+    def __contains__(self, drug):
+        return normalize(drug) in self.drug_set
+
+    def __len__(self):
+        return len(self.base)
+
+
+def overlay_path(tenant):
+    if not _TENANT_RE.match(tenant):
+        raise ValueError(f"Invalid tenant name: {tenant!r}")
+    return os.path.join(OVERLAY_DIR, tenant + ".json")
+
+
+def find_overlay(tenant):
+    """Overlay file for a tenant, or None (no tenant, invalid name or no file)."""
+    if not tenant or not _TENANT_RE.match(tenant):
+        return None
+    path = overlay_path(tenant)
+    return path if os.path.exists(data_layer.asset_path(path)) else None
+
+
+def get_store(tenant=None):
+    """
+    Interaction store for a tenant: the shared base (explicit pairs plus
+    class/enzyme rules, see ddi_rules.get_store()) with
+    overlays/<tenant>.json layered on top. Without a tenant, or when
+    the tenant has no overlay file, the base store is returned as-is.
+    """
+    base = ddi_rules.get_store()
+    path = find_overlay(tenant)
+    if path is None:
+        return base
+    overlay = data_layer.load(path, load_overlay)
+    # Reuse the layered view until the base or the overlay is reloaded
+    return data_layer.derived(("overlay", tenant), LayeredInteractionStore, base, overlay)
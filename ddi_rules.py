@@ -0,0 +1,163 @@
+from types import MappingProxyType
+
+import data_layer
+import ddi_index
+from ddi_index import merge_record, normalize, pair_key, severity_rank
+
+# ------------------ RULE-BASED INTERACTIONS ------------------
+# Derives interactions from drug class membership and CYP enzyme tables
+# (drug_classes.json) instead of listing every pair:
+#
+#   - class_rules: any drug of class X with any drug of class Y
+#   - enzymes: an inhibitor of an enzyme with a substrate of that enzyme
+#
+# Data grows with the number of drugs and rules, not with the number of
+# pairs. Explicit entries in the pair store always win over derived ones.
+
+CLASSES_FILE = "drug_classes.json"
+
+# Each enzyme table may give its own "effect" (e.g. less active drug for a
+# prodrug substrate); the advice follows the table's severity.
+ENZYME_DESCRIPTION = "{inhibitor} inhibits {enzyme}, which metabolizes {substrate}; {effect}. {advice}"
+DEFAULT_ENZYME_EFFECT = "levels of {substrate} may increase"
+
+# Advice closing an enzyme rule description, by severity rank
+SEVERITY_ADVICE = {
+    0: "No action needed.",
+    1: "Monitor therapy.",
+    2: "Use Caution/Monitor.",
+    3: "Avoid or Use Alternate Drug.",
+    4: "Contraindicated; do not coadminister.",
+}
+
+
+class DrugRules:
+    """Per-drug class and enzyme memberships plus the class-pair rule table."""
+
+    __slots__ = ("display", "classes", "inhibits", "substrate_of", "class_rules", "enzyme_severity", "enzyme_effect")
+
+    def __init__(self, data):
+        display = {}
+        classes = {}
+        for class_name, members in data.get("classes", {}).items():
+            for drug in members:
+                display.setdefault(normalize(drug), drug.strip())
+                classes.setdefault(normalize(drug), set()).add(class_name)
+
+        class_rules = {}
+        for rule in data.get("class_rules", ()):
+            c1, c2 = rule["classes"]
+            record = {
+                "type": rule.get("type", "Pharmacodynamic"),
+                "severity": rule["severity"],
+                "description": rule["description"] + f" (Inferred from drug classes: {c1} + {c2}.)",
+                "source": "class rule",
+            }
+            key = pair_key(c1, c2)
+            class_rules[key] = merge_record(class_rules.get(key), record)
+
+        inhibits = {}
+        substrate_of = {}
+        enzyme_severity = {}
+        enzyme_effect = {}
+        for enzyme, table in data.get("enzymes", {}).items():
+            enzyme_severity[enzyme] = table.get("severity", "monitor closely")
+            enzyme_effect[enzyme] = table.get("effect", DEFAULT_ENZYME_EFFECT)
+            for drug in table.get("inhibitors", ()):
+                display.setdefault(normalize(drug), drug.strip())
+                inhibits.setdefault(normalize(drug), set()).add(enzyme)
+            for drug in table.get("substrates", ()):
+                display.setdefault(normalize(drug), drug.strip())
+                substrate_of.setdefault(normalize(drug), set()).add(enzyme)
+
+        self.display = MappingProxyType(display)
+        self.classes = MappingProxyType({d: frozenset(c) for d, c in classes.items()})
+        self.inhibits = MappingProxyType({d: frozenset(e) for d, e in inhibits.items()})
+        self.substrate_of = MappingProxyType({d: frozenset(e) for d, e in substrate_of.items()})
+        self.class_rules = MappingProxyType(class_rules)
+        self.enzyme_severity = MappingProxyType(enzyme_severity)
+        self.enzyme_effect = MappingProxyType(enzyme_effect)
+
+    def _enzyme_record(self, inhibitor, substrate, enzyme):
+        severity = self.enzyme_severity[enzyme]
+        substrate = self.display.get(substrate, substrate)
+        return {
+            "type": "Pharmacokinetic",
+            "severity": severity,
+            "description": ENZYME_DESCRIPTION.format(
+                inhibitor=self.display.get(inhibitor, inhibitor),
+                substrate=substrate,
+                enzyme=enzyme,
+                effect=self.enzyme_effect[enzyme].format(substrate=substrate),
+                advice=SEVERITY_ADVICE[severity_rank(severity)],
+            ),
+            "source": "enzyme rule",
+        }
+
+    def infer(self, d1, d2):
+        """Derived interaction for two normalized names, or None."""
+        if d1 == d2:
+            return None
+        result = None
+        empty = frozenset()
+        for c1 in self.classes.get(d1, empty):
+            for c2 in self.classes.get(d2, empty):
+                rule = self.class_rules.get(pair_key(c1, c2))
+                if rule is not None:
+                    result = merge_record(result, rule)
+        for inhibitor, substrate in ((d1, d2), (d2, d1)):
+            for enzyme in sorted(self.inhibits.get(inhibitor, empty) & self.substrate_of.get(substrate, empty)):
+                result = merge_record(result, self._enzyme_record(inhibitor, substrate, enzyme))
+        return result
+
+    @property
+    def drugs(self):
+        return self.display.keys()
+
+
+def load_rules(path):
+    return DrugRules(data_layer.read_json(path))
+
+
+class InferredInteractionStore:
+    """
+    Explicit pairs from a base store, falling back to class/enzyme rules.
+    The drug list is the base's: drugs named only in drug_classes.json
+    (not on NLEM, no interaction data) are not added.
+    """
+
+    def __init__(self, base, rules):
+        self.base = base
+        self.rules = rules
+        self.drug_set = frozenset(base.drugs)
+        self.drugs = tuple(sorted(self.drug_set))
+
+    def get(self, d1, d2):
+        explicit = self.base.get(d1, d2)
+        if explicit is not None:
+            return explicit
+        return self.rules.infer(normalize(d1), normalize(d2))
+
+    def interactions_among(self, drugs):
+        names = sorted({normalize(d) for d in drugs})
+        result = dict(self.base.interactions_among(names))
+        for i, a in enumerate(names):
+            for b in names[i + 1:]:
+                if (a, b) not in result:
+                    inferred = self.rules.infer(a, b)
+                    if inferred is not None:
+                        result[(a, b)] = inferred
+        return result
+
+    def __contains__(self, drug):
+        return normalize(drug) in self.drug_set
+
+    def __len__(self):
+        return len(self.base)
+
+
+def get_store():
+    """Shared base store (ddi_index.get_store()) with drug_classes.json rules layered on."""
+    base = ddi_index.get_store()
+    rules = data_layer.load(CLASSES_FILE, load_rules)
+    return data_layer.derived("rules", InferredInteractionStore, base, rules)
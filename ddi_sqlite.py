@@ -0,0 +1,141 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+import data_layer
+from ddi_index import merge_record, normalize, pair_key
+
+# ------------------ SQLITE INTERACTION STORE ------------------
+# On-disk alternative to ddi_index.InteractionIndex for full-size DDI
+# datasets. Pairs live in an indexed table keyed by the canonical
+# (drug_a, drug_b) pair, so memory stays flat no matter how many pairs
+# the source has. Enable it in the app by pointing DDI_SQLITE_PATH at a
+# database built with:
+#
+#     python ddi_sqlite.py filtered_ddi.json data/ddi.sqlite
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drugs (
+    name TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS interactions (
+    drug_a TEXT NOT NULL,
+    drug_b TEXT NOT NULL,
+    type TEXT,
+    severity TEXT NOT NULL,
+    description TEXT,
+    PRIMARY KEY (drug_a, drug_b)
+) WITHOUT ROWID;
+"""
+
+
+def write_pairs(db_path, pairs):
+    """
+    Write (drug_a, drug_b, interaction) triples to a new SQLite database.
+
+    Names are normalized and each pair is stored once in canonical order;
+    pairs are expected to be unique (a repeated pair replaces the earlier row).
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(SCHEMA)
+        rows = (
+            pair_key(normalize(d1), normalize(d2))
+            + (it.get("type"), it["severity"], it.get("description"))
+            for d1, d2, it in pairs
+        )
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO interactions VALUES (?, ?, ?, ?, ?)", rows)
+            conn.execute(
+                "INSERT OR IGNORE INTO drugs SELECT drug_a FROM interactions "
+                "UNION SELECT drug_b FROM interactions"
+            )
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+def build_sqlite(ddi_data, db_path):
+    """Convert the nested filtered_ddi.json dict into a SQLite database."""
+    merged = {}
+    for d1, interactions in ddi_data.items():
+        for d2, interaction in interactions.items():
+            key = pair_key(normalize(d1), normalize(d2))
+            merged[key] = merge_record(merged.get(key), interaction)
+    write_pairs(db_path, ((a, b, it) for (a, b), it in merged.items()))
+
+
+class SqliteInteractionStore:
+    """
+    Read-only pair lookups against a SQLite database, safe to share across
+    threads and forked processes (each process opens its own connection).
+    """
+
+    def __init__(self, db_path):
+        self._uri = "file:" + os.path.abspath(db_path) + "?mode=ro"
+        self._inherited = []
+        self._connect()
+        self.drugs = tuple(row[0] for row in self._query("SELECT name FROM drugs ORDER BY name"))
+        self.drug_set = frozenset(self.drugs)
+
+    def _connect(self):
+        self._pid = os.getpid()
+        self._conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def _query(self, sql, params=()):
+        if self._pid != os.getpid():
+            # Forked (e.g. a process-pool worker): SQLite connections must not
+            # be used across fork(). The parent's is kept, never used or closed.
+            self._inherited.append(self._conn)
+            self._connect()
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get(self, d1, d2):
+        """Interaction record for two drug names, or None."""
+        rows = self._query(
+            "SELECT type, severity, description FROM interactions WHERE drug_a = ? AND drug_b = ?",
+            pair_key(normalize(d1), normalize(d2)),
+        )
+        if not rows:
+            return None
+        t, severity, description = rows[0]
+        return {"type": t, "severity": severity, "description": description}
+
+    def interactions_among(self, drugs):
+        """All known pairs within a list of drugs, as {pair_key: record}."""
+        names = json.dumps(sorted({normalize(d) for d in drugs}))
+        rows = self._query(
+            "SELECT drug_a, drug_b, type, severity, description FROM interactions "
+            "WHERE drug_a IN (SELECT value FROM json_each(?)) "
+            "AND drug_b IN (SELECT value FROM json_each(?))",
+            (names, names),
+        )
+        return {
+            (a, b): {"type": t, "severity": severity, "description": description}
+            for a, b, t, severity, description in rows
+        }
+
+    def __contains__(self, drug):
+        return normalize(drug) in self.drug_set
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM interactions")[0][0]
+
+
+def get_store(db_path):
+    """Shared store for a database file (reopened when the file changes)."""
+    return data_layer.load(db_path, SqliteInteractionStore, content_hash=False)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python ddi_sqlite.py <filtered_ddi.json> <output.sqlite>")
+    build_sqlite(data_layer.read_json(sys.argv[1]), sys.argv[2])
+    print(f"Wrote {sys.argv[2]}")
@@ -0,0 +1,109 @@
+import re
+import unicodedata
+from types import MappingProxyType
+
+import data_layer
+from ddi_index import normalize
+
+# ------------------ DRUG ALIASES ------------------
+# Resolves brand names, synonyms and salt/ester forms ("Crocin",
+# "Dolo 650", "Amlodipine besylate", "Acetaminophen") to the canonical
+# drug ID used by the interaction stores (the normalized generic name).
+#
+# drug_aliases.json maps each generic to its aliases. Every alias and every
+# drug in the store is reduced with fold() once, when the index is built,
+# so a lookup is fold(query) plus a few dictionary hits. Salt words are only
+# dropped at lookup time, and only when the shorter name is known: the
+# index keeps "magnesium sulfate" and "magnesium hydroxide" apart.
+
+ALIASES_FILE = "drug_aliases.json"
+
+# Salt / ester / hydrate words that may trail a known name
+SALT_WORDS = frozenset("""
+    hydrochloride hcl hydrobromide besylate besilate maleate mesylate mesilate
+    sulfate sulphate succinate tartrate fumarate citrate acetate sodium
+    potassium calcium magnesium dipropionate propionate valerate phosphate
+    monohydrate dihydrate trihydrate anhydrous
+""".split())
+
+# Strength / dose-form tokens: "650", "500mg", "2.5 mg", "10%", "er", "sr"
+_STRENGTH_RE = re.compile(r"^\d+(\.\d+)?(mg|mcg|g|ml|iu|%)?$|^(mg|mcg|g|ml|iu|tab|tabs|cap|caps|sr|er|xr|cr|dt|ds|forte)$")
+_PUNCT_RE = re.compile(r"[^\w%.]+")
+
+
+def fold_words(text):
+    """Unicode- and case-fold text and split it into words (punctuation dropped)."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    return [w.strip(".") for w in _PUNCT_RE.sub(" ", text).split()]
+
+
+def fold(name):
+    """
+    Reduce a drug name to its lookup key: Unicode-fold, case-fold, drop
+    punctuation and strengths.
+    """
+    words = fold_words(name)
+    return " ".join(w for w in words if w and not _STRENGTH_RE.match(w))
+
+
+class AliasIndex:
+    """Precomputed folded-alias -> canonical drug ID table."""
+
+    __slots__ = ("canonical", "entries")
+
+    def __init__(self, alias_data, drugs=()):
+        canonical = {}
+        entries = []
+        # Drugs known to the interaction store map to themselves
+        for drug in drugs:
+            canonical.setdefault(fold(drug), normalize(drug))
+        for generic, aliases in alias_data.items():
+            target = normalize(generic)
+            canonical.setdefault(fold(generic), target)
+            for alias in aliases:
+                canonical.setdefault(fold(alias), target)
+                entries.append((alias, target))
+        self.canonical = MappingProxyType(canonical)
+        # (alias as written, canonical ID) pairs, for search listings
+        self.entries = tuple(entries)
+
+    def key(self, name):
+        """
+        Lookup key for name: fold(name), less trailing salt words when the
+        name as written is unknown but a shorter form of it is known.
+        """
+        words = fold(name).split(" ")
+        key = " ".join(words)
+        if key in self.canonical:
+            return key
+        while len(words) > 1 and words[-1] in SALT_WORDS:
+            words.pop()
+            shorter = " ".join(words)
+            if shorter in self.canonical:
+                return shorter
+        return key
+
+    def resolve(self, name):
+        """
+        Canonical drug ID for any alias. Unknown names come back folded, so
+        callers can still check them against the store.
+        """
+        key = self.key(name)
+        return self.canonical.get(key, key)
+
+    def __contains__(self, name):
+        return self.key(name) in self.canonical
+
+    def __len__(self):
+        return len(self.canonical)
+
+
+def build_alias_index(alias_data, store):
+    return AliasIndex(alias_data, store.drugs)
+
+
+def get_alias_index(store):
+    """Alias index over drug_aliases.json plus the store's drug list, cached per version."""
+    alias_data = data_layer.load(ALIASES_FILE)
+    return data_layer.derived(("aliases", id(store)), build_alias_index, alias_data, store)
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import time
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+import data_layer
+import drug_aliases
+from drug_aliases import SALT_WORDS
+
+# ------------------ DRUG AUTOCOMPLETE COMPONENT ------------------
+# Browser-side drug search for the Drug Assistant. The drug/alias index is
+# written once per data version to a content-addressed JSON file inside the
+# component directory; the browser fetches it once (it is served with a
+# cacheable URL) and filters locally as the user types. Only the drug the
+# user finally picks is sent back, so typing causes no script reruns.
+#
+# Renders touch their index file (at most every TOUCH_EVERY seconds per
+# process, so reruns do no file I/O). Writing a new one deletes the files
+# not touched for PRUNE_AFTER seconds (old data versions and tenants), so
+# the directory does not grow with each reload. A file pruned by another
+# process is written again at the next touch; a browser whose fetch fails
+# meanwhile asks for the index inline instead.
+#
+# Ranking mirrors drug_search.DrugSearchIndex: exact alias, name prefix,
+# word prefix, in-word substring, then spelling suggestions.
+
+COMPONENT_DIR = data_layer.asset_path(os.path.join("components", "drug_autocomplete"))
+
+# Seconds an index file may go unused before a newer publish deletes it
+PRUNE_AFTER = 3600
+TOUCH_EVERY = PRUNE_AFTER / 2
+
+# Index file name -> time.monotonic() of this process's last touch
+_touched = {}
+
+_component = components.declare_component("drug_autocomplete", path=COMPONENT_DIR)
+
+
+def build_payload(store, alias_index):
+    """Compact JSON index: drug IDs, (alias, drug number) pairs and the folded-name table."""
+    drugs = list(store.drugs)
+    number = {drug: i for i, drug in enumerate(drugs)}
+    payload = {
+        "drugs": drugs,
+        "aliases": [[alias, number[target]] for alias, target in alias_index.entries if target in number],
+        "canonical": {key: number[target] for key, target in alias_index.canonical.items() if target in number},
+        "salts": sorted(SALT_WORDS),
+    }
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _prune(keep):
+    """Delete published index files other than keep that no render touched recently."""
+    cutoff = time.time() - PRUNE_AFTER
+    for name in os.listdir(COMPONENT_DIR):
+        if name == keep or not (name.startswith("index-") and name.endswith(".json")):
+            continue
+        path = os.path.join(COMPONENT_DIR, name)
+        try:
+            if os.stat(path).st_mtime < cutoff:
+                os.remove(path)
+        except OSError:
+            # Removed by another process, or not ours to remove
+            pass
+
+
+def publish_index(store, alias_index):
+    """
+    Write the payload as index-<hash>.json next to the component and return
+    its file name and version. Falls back to the payload itself (sent
+    inline with every render) when the directory is not writable.
+    """
+    data = build_payload(store, alias_index)
+    name = f"index-{hashlib.blake2b(data, digest_size=8).hexdigest()}.json"
+    path = os.path.join(COMPONENT_DIR, name)
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return {"inline": json.loads(data), "version": name}
+        _prune(name)
+    _touched[name] = time.monotonic()
+    return {"url": name, "version": name}
+
+
+def inline_index(store, alias_index):
+    """The payload itself, for browsers that could not fetch the file."""
+    data = build_payload(store, alias_index)
+    return {"inline": json.loads(data), "version": f"index-{hashlib.blake2b(data, digest_size=8).hexdigest()}.json"}
+
+
+def get_index_asset(store, inline=False):
+    """Published (or inline) index for a store plus drug_aliases.json, cached per version."""
+    alias_index = drug_aliases.get_alias_index(store)
+    if inline:
+        return data_layer.derived(("autocomplete_inline", id(store)), inline_index, store, alias_index)
+    asset = data_layer.derived(("autocomplete", id(store)), publish_index, store, alias_index)
+    name = asset.get("url")
+    now = time.monotonic()
+    if name is not None and now - _touched.get(name, now - TOUCH_EVERY) >= TOUCH_EVERY:
+        # Mark the file as in use; write it again if it was pruned meanwhile
+        _touched[name] = now
+        try:
+            os.utime(os.path.join(COMPONENT_DIR, name))
+        except OSError:
+            asset = publish_index(store, alias_index)
+    return asset
+
+
+def drug_autocomplete(store, placeholder="🔍 Search Drug", limit=20, key="drug_autocomplete"):
+    """
+    Render the autocomplete box. Returns {"drug": drug_id, "nonce": str} for
+    the last pick (a fresh nonce per pick, so picking the same drug twice is
+    seen twice), or None before the first one.
+    """
+    inline_key = f"{key}_inline"
+    value = _component(
+        index=get_index_asset(store, st.session_state.get(inline_key, False)),
+        placeholder=placeholder, limit=limit, key=key, default=None,
+    )
+    if value and value.get("fallback"):
+        # The browser could not fetch the index file: send it inline from now on
+        if not st.session_state.get(inline_key):
+            st.session_state[inline_key] = True
+            st.rerun()
+        return None
+    return value
@@ -0,0 +1,192 @@
+import bisect
+import heapq
+from array import array
+from collections import Counter
+
+import data_layer
+import drug_aliases
+from drug_aliases import fold_words
+
+# ------------------ DRUG SEARCH INDEX ------------------
+# Sorted-array index for the Drug Assistant search box. Built once per
+# store / alias version; a query is a few binary searches instead of a
+# substring scan over every name.
+#
+# Matches are ranked in tiers, best first:
+#   0  exact name or alias (via the alias resolver)
+#   1  the whole name starts with the query
+#   2  a word of the name starts with the query ("trinitrate" -> glyceryl trinitrate)
+#   3  the query occurs inside a generic name ("floxacin" -> ciprofloxacin)
+# Within a tier, generics come before brand aliases, then names sort
+# alphabetically.
+#
+# When none of these match, a trigram inverted index proposes spelling
+# candidates ("metfromin" -> metformin); edit distance is only computed for
+# the few names that share the most trigrams with the query.
+
+# Shortest in-word fragment served by the substring (suffix) tier
+MIN_SUFFIX = 3
+
+# Names sharing the most trigrams with a misspelt query that get an edit
+# distance check
+FUZZY_CANDIDATES = 50
+
+
+def search_key(text):
+    return " ".join(fold_words(text))
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (adjacent transpositions count as
+    one edit), or limit + 1 as soon as it is certain to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class _TrigramIndex:
+    """Inverted index from trigram to the names containing it."""
+
+    __slots__ = ("keys", "entries", "postings")
+
+    def __init__(self, pairs):
+        self.keys = [k for k, _ in pairs]
+        self.entries = [e for _, e in pairs]
+        postings = {}
+        for i, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                postings.setdefault(gram, array("I")).append(i)
+        self.postings = postings
+
+    def similar(self, query, limit):
+        """Entries within edit distance limit of query, as [(distance, entry)]."""
+        grams = trigrams(query)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        # One edit (a transposition at worst) changes at most four trigrams
+        floor = max(1, len(grams) - 4 * limit)
+        candidates = heapq.nlargest(FUZZY_CANDIDATES, (i for i, n in shared.items() if n >= floor), key=shared.__getitem__)
+        found = []
+        for i in candidates:
+            distance = edit_distance(query, self.keys[i], limit)
+            if distance <= limit:
+                found.append((distance, self.entries[i]))
+        return found
+
+
+class _SortedTerms:
+    """Parallel sorted arrays of keys and the entry each key points to."""
+
+    __slots__ = ("keys", "entries")
+
+    def __init__(self, pairs):
+        pairs.sort()
+        self.keys = [k for k, _ in pairs]
+        self.entries = [e for _, e in pairs]
+
+    def prefix(self, query):
+        """Entries whose key starts with query, in key order (lazy)."""
+        i = bisect.bisect_left(self.keys, query)
+        keys = self.keys
+        while i < len(keys) and keys[i].startswith(query):
+            yield self.entries[i]
+            i += 1
+
+
+class DrugSearchIndex:
+    """Prefix / word-prefix / suffix / trigram index over drug names and aliases."""
+
+    def __init__(self, drugs, alias_entries=(), alias_index=None):
+        # Entry = (is_alias, label, drug_id); tuples sort generics first
+        self.drug_set = frozenset(drugs)
+        names = [(0, drug, drug) for drug in drugs]
+        names += [(1, alias, target) for alias, target in alias_entries if target in self.drug_set]
+        self.alias_index = alias_index
+
+        full, words, suffixes = [], [], []
+        for entry in names:
+            key = search_key(entry[1])
+            full.append((key, entry))
+            for w in key.split()[1:]:
+                words.append((w, entry))
+            if not entry[0]:
+                # Generic names only: in-word fragments for substring search
+                for start in range(1, len(key) - MIN_SUFFIX + 1):
+                    if key[start - 1] != " " and key[start] != " ":
+                        suffixes.append((key[start:], entry))
+        self.fuzzy = _TrigramIndex(full)
+        self.full = _SortedTerms(full)
+        self.words = _SortedTerms(words)
+        self.suffixes = _SortedTerms(suffixes)
+
+    def search(self, query, k=20):
+        """
+        Top-k matches as [(drug_id, label)], label being the name or alias
+        that matched. Each drug appears once, under its best match. Falls
+        back to spelling suggestions when nothing matches exactly.
+        """
+        q = search_key(query)
+        if not q:
+            return []
+        results = []
+        seen = set()
+
+        def add(drug_id, label):
+            if drug_id not in seen:
+                seen.add(drug_id)
+                results.append((drug_id, label))
+            return len(results) >= k
+
+        if self.alias_index is not None and query in self.alias_index:
+            drug_id = self.alias_index.resolve(query)
+            if drug_id in self.drug_set and add(drug_id, query.strip()):
+                return results
+        tiers = [self.full.prefix(q), self.words.prefix(q)]
+        if len(q) >= MIN_SUFFIX:
+            tiers.append(self.suffixes.prefix(q))
+        for tier in tiers:
+            # Collect a tier, then rank it (generics first, then by label)
+            matches = []
+            for entry in tier:
+                if entry[2] not in seen:
+                    matches.append(entry)
+                    if len(matches) >= 4 * k:
+                        break
+            for _, label, drug_id in sorted(matches):
+                if add(drug_id, label):
+                    return results
+        if not results:
+            for _, (_, label, drug_id) in sorted(self.fuzzy.similar(q, max(1, len(q) // 4))):
+                if add(drug_id, label):
+                    break
+        return results
+
+
+def build_search_index(store, alias_index):
+    return DrugSearchIndex(store.drugs, alias_index.entries, alias_index)
+
+
+def get_search_index(store):
+    """Search index for a store plus drug_aliases.json, cached per version."""
+    alias_index = drug_aliases.get_alias_index(store)
+    return data_layer.derived(("drug_search", id(store)), build_search_index, store, alias_index)
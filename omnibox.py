@@ -0,0 +1,132 @@
+import bisect
+import math
+from collections import defaultdict
+
+import calculators
+import data_layer
+import drug_aliases
+from drug_aliases import fold_words
+
+# ------------------ GLOBAL SEARCH ------------------
+# One inverted index over everything the app shows: calculators, drugs
+# (with brand aliases), normal-value parameters and protocol sections.
+# Built once per data version; a query is one posting-list lookup per word
+# (the last word is matched as a prefix, so results appear while typing).
+#
+# Each hit is a Document telling the UI which page to open and which item
+# to select there.
+
+PROTOCOLS_FILE = "protocols.json"
+NORMAL_VALUES_FILE = "normal_values.json"
+
+# Field weights: a word in a title counts more than one in body text
+TITLE_WEIGHT = 3.0
+CONTEXT_WEIGHT = 1.5
+BODY_WEIGHT = 1.0
+
+
+class Document:
+    """A searchable item and where it lives in the app."""
+
+    __slots__ = ("page", "item", "section", "title", "subtitle")
+
+    def __init__(self, page, item, title, subtitle="", section=None):
+        self.page = page
+        self.item = item
+        self.section = section
+        self.title = title
+        self.subtitle = subtitle
+
+    def __repr__(self):
+        return f"Document({self.page!r}, {self.item!r}, {self.title!r})"
+
+
+class OmniboxIndex:
+    """Weighted inverted index: word -> {document id: weight}."""
+
+    def __init__(self):
+        self.documents = []
+        self._postings = defaultdict(dict)
+
+    def add(self, document, title, context="", body=""):
+        doc_id = len(self.documents)
+        self.documents.append(document)
+        for text, weight in ((title, TITLE_WEIGHT), (context, CONTEXT_WEIGHT), (body, BODY_WEIGHT)):
+            for word in fold_words(text):
+                postings = self._postings[word]
+                postings[doc_id] = max(postings.get(doc_id, 0.0), weight)
+
+    def freeze(self):
+        """Finish building: sort the vocabulary for prefix lookups."""
+        self._postings = dict(self._postings)
+        self.vocabulary = sorted(self._postings)
+        return self
+
+    def _matches(self, word, prefix):
+        if not prefix:
+            return self._postings.get(word, {})
+        # Union of postings for every vocabulary word starting with word
+        merged = {}
+        i = bisect.bisect_left(self.vocabulary, word)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(word):
+            for doc_id, weight in self._postings[self.vocabulary[i]].items():
+                if weight > merged.get(doc_id, 0.0):
+                    merged[doc_id] = weight
+            i += 1
+        return merged
+
+    def search(self, query, k=10):
+        """Top-k documents containing every query word, best first."""
+        words = fold_words(query)
+        if not words:
+            return []
+        scores = None
+        n = len(self.documents)
+        for pos, word in enumerate(words):
+            postings = self._matches(word, prefix=pos == len(words) - 1)
+            if not postings:
+                return []
+            idf = math.log(1 + n / len(postings))
+            if scores is None:
+                scores = {doc_id: weight * idf for doc_id, weight in postings.items()}
+            else:
+                scores = {doc_id: s + postings[doc_id] * idf for doc_id, s in scores.items() if doc_id in postings}
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], len(self.documents[item[0]].title), item[0]))
+        return [self.documents[doc_id] for doc_id, _ in ranked[:k]]
+
+
+def build_omnibox(protocols, normal_values, store, alias_index):
+    index = OmniboxIndex()
+
+    for calc in calculators.ALL_CALCULATORS:
+        categories = " ".join(calculators.CATEGORIES[calc])
+        index.add(Document("Calculator", calc, calc, categories), calc, categories, calculators.CALCULATORS[calc].title or "")
+
+    aliases = defaultdict(list)
+    for alias, target in alias_index.entries:
+        aliases[target].append(alias)
+    for drug in store.drugs:
+        names = ", ".join(aliases.get(drug, ()))
+        index.add(Document("Drug Assistant", drug, drug, names), drug, names)
+
+    for system, params in normal_values.items():
+        for param, value in params.items():
+            index.add(Document("Normal Values", (system, param), param, f"{system}: {value}"), param, system)
+
+    for protocol in protocols:
+        name = protocol["name"]
+        index.add(Document("Indian Protocols", name, protocol["title"]), protocol["title"], name)
+        for section in protocol["sections"]:
+            index.add(
+                Document("Indian Protocols", name, section["title"], name, section=section["title"]),
+                section["title"], name, section["body"],
+            )
+    return index.freeze()
+
+
+def get_omnibox(store):
+    """Global search index for the current data files and interaction store."""
+    protocols = data_layer.load(PROTOCOLS_FILE)
+    normal_values = data_layer.load(NORMAL_VALUES_FILE)
+    alias_index = drug_aliases.get_alias_index(store)
+    return data_layer.derived(("omnibox", id(store)), build_omnibox, protocols, normal_values, store, alias_index)
@@ -0,0 +1,318 @@
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+
+import data_layer
+from ddi_index import normalize, pair_key, severity_rank
+
+# ------------------ REGIMEN CHECK ------------------
+# One pass over a drug list that returns both the pairwise interactions
+# and per-drug flags (renal dosing, pregnancy category, hepatic caution)
+# for the patient. Per-drug attributes live in drug_attributes.json, keyed
+# by the same drug ID (normalized generic name) as the interaction stores.
+#
+# RegimenState keeps those pair results between reruns of one session:
+# adding the nth drug looks up only its n-1 new pairs, removing a drug
+# drops its pairs.
+#
+# ReportCache shares pair results across sessions: one bounded LRU per store
+# (so per data version and tenant), keyed by the set of drug IDs. Concurrent
+# requests for the same set wait for a single computation.
+
+ATTRIBUTES_FILE = "drug_attributes.json"
+
+# Pregnancy categories that should stand out
+PREGNANCY_LEVELS = {"X": "error", "D": "warning"}
+
+# Regimens kept per store by the shared report cache
+REPORT_CACHE_SIZE = 1024
+
+
+class DrugRecord:
+    """Per-drug clinical attributes (None when not applicable)."""
+
+    __slots__ = ("pregnancy_category", "renal_egfr_below", "renal_advice", "hepatic_caution")
+
+    def __init__(self, data):
+        self.pregnancy_category = data.get("pregnancy_category")
+        self.renal_egfr_below = data.get("renal_egfr_below")
+        self.renal_advice = data.get("renal_advice")
+        self.hepatic_caution = data.get("hepatic_caution")
+
+
+def load_attributes(path):
+    data = data_layer.read_json(path)
+    return MappingProxyType({normalize(drug): DrugRecord(attrs) for drug, attrs in data.items()})
+
+
+def get_attributes():
+    return data_layer.load(ATTRIBUTES_FILE, load_attributes)
+
+
+class Patient:
+    """Patient factors a regimen is checked against (all optional)."""
+
+    __slots__ = ("egfr", "pregnant", "hepatic_impairment")
+
+    def __init__(self, egfr=None, pregnant=False, hepatic_impairment=False):
+        self.egfr = egfr
+        self.pregnant = pregnant
+        self.hepatic_impairment = hepatic_impairment
+
+
+def drug_flags(record, patient):
+    """(kind, level, message) flags for one drug; level is error/warning/info."""
+    flags = []
+    if record is None or patient is None:
+        return flags
+    if patient.egfr is not None and record.renal_egfr_below is not None and patient.egfr < record.renal_egfr_below:
+        flags.append(("renal", "warning", record.renal_advice or f"Adjust dose when eGFR < {record.renal_egfr_below}."))
+    if patient.pregnant and record.pregnancy_category:
+        category = record.pregnancy_category
+        flags.append(("pregnancy", PREGNANCY_LEVELS.get(category, "info"), f"Pregnancy category {category}."))
+    if patient.hepatic_impairment and record.hepatic_caution:
+        flags.append(("hepatic", "warning", record.hepatic_caution))
+    return flags
+
+
+class RegimenReport:
+    """
+    Result of check_regimen().
+
+    pairs: [(drug_1, drug_2, interaction or None)] in combinations() order
+    flags: [(drug, kind, level, message)]
+    """
+
+    __slots__ = ("drugs", "pairs", "flags")
+
+    def __init__(self, drugs, pairs, flags):
+        self.drugs = drugs
+        self.pairs = pairs
+        self.flags = flags
+
+    def ranked_pairs(self, include_none=False):
+        """
+        [(rank, drug_1, drug_2, interaction)] worst first, for table views.
+        Pairs with no data rank -1; they and "no interaction" pairs (rank 0)
+        are left out unless include_none is set.
+        """
+        rows = []
+        for d1, d2, interaction in self.pairs:
+            rank = -1 if interaction is None else severity_rank(interaction["severity"])
+            if rank > 0 or include_none:
+                rows.append((rank, d1, d2, interaction))
+        rows.sort(key=lambda row: -row[0])
+        return rows
+
+    def severity_counts(self):
+        """{rank: number of pairs} for the interaction tiers present (rank > 0)."""
+        counts = {}
+        for _, _, interaction in self.pairs:
+            if interaction is not None:
+                rank = severity_rank(interaction["severity"])
+                if rank > 0:
+                    counts[rank] = counts.get(rank, 0) + 1
+        return counts
+
+
+class _Pending:
+    """A computation in flight: waiters block until the owner publishes it."""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def result(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class ReportCache:
+    """
+    Bounded LRU of {pair_key: interaction} results keyed by a frozenset of
+    drug IDs, with request coalescing. Cached values are read-only.
+    """
+
+    def __init__(self, maxsize=REPORT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, or compute() it once even when asked concurrently."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = _Pending()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not owner:
+            return pending.result()
+
+        try:
+            value = MappingProxyType(dict(compute()))
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            pending.error = exc
+            pending.done.set()
+            raise
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            del self._inflight[key]
+        pending.value = value
+        pending.done.set()
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _new_report_cache(store):
+    return ReportCache()
+
+
+def get_report_cache(store):
+    """Shared report cache for a store; a new store (data version) gets a fresh one."""
+    return data_layer.derived(("report_cache", id(store)), _new_report_cache, store)
+
+
+def check_regimen(drugs, store, attributes=None, patient=None, cache=None):
+    """
+    Pairwise interactions plus per-drug flags for a drug list, in a single
+    pass. With a ReportCache, pair results are shared across callers.
+    """
+    attributes = get_attributes() if attributes is None else attributes
+    drugs = list(drugs)
+    names = [normalize(d) for d in drugs]
+    if cache is None:
+        known = store.interactions_among(names)
+    else:
+        known = cache.get_or_compute(frozenset(names), lambda: store.interactions_among(names))
+    pairs = []
+    flags = []
+    for i, drug in enumerate(drugs):
+        for kind, level, message in drug_flags(attributes.get(names[i]), patient):
+            flags.append((drug, kind, level, message))
+        for j in range(i + 1, len(drugs)):
+            pairs.append((drug, drugs[j], known.get(pair_key(names[i], names[j]))))
+    return RegimenReport(drugs, pairs, flags)
+
+
+class RegimenState:
+    """
+    A session's drug list with its pair results cached by pair key. Results
+    are recomputed from scratch only when the store itself changes (new data
+    version or another tenant).
+    """
+
+    __slots__ = ("store", "drugs", "names", "results")
+
+    def __init__(self, store):
+        self.store = store
+        self.drugs = []
+        self.names = []
+        # Only pairs that interact are kept; a missing key means none
+        self.results = {}
+
+    def add(self, drug):
+        """Add a drug, looking up only its pairs with the drugs already present."""
+        name = normalize(drug)
+        if name in self.names:
+            return False
+        for other in self.names:
+            interaction = self.store.get(name, other)
+            if interaction is not None:
+                self.results[pair_key(name, other)] = interaction
+        self.drugs.append(drug)
+        self.names.append(name)
+        return True
+
+    def remove(self, drug):
+        """Remove a drug and drop its pairs."""
+        name = normalize(drug)
+        if name not in self.names:
+            return False
+        i = self.names.index(name)
+        del self.drugs[i], self.names[i]
+        for other in self.names:
+            self.results.pop(pair_key(name, other), None)
+        return True
+
+    def sync(self, drugs, store, cache=None):
+        """
+        Bring the state in line with a drug list, doing only the work for
+        what changed. With a ReportCache, a drug set another session already
+        checked is taken from the cache instead.
+        """
+        if store is not self.store:
+            self.store = store
+            self.drugs, self.names, self.results = [], [], {}
+        drugs = list(drugs)
+        wanted = {normalize(d) for d in drugs}
+        for drug in [d for d, n in zip(self.drugs, self.names) if n not in wanted]:
+            self.remove(drug)
+        added = [d for d in drugs if normalize(d) not in self.names]
+        if not added:
+            return self
+        if cache is None:
+            for drug in added:
+                self.add(drug)
+            return self
+
+        def compute():
+            for drug in added:
+                self.add(drug)
+            return self.results
+
+        results = cache.get_or_compute(frozenset(wanted), compute)
+        for drug in added:
+            if normalize(drug) not in self.names:
+                self.drugs.append(drug)
+                self.names.append(normalize(drug))
+        self.results = dict(results)
+        return self
+
+    def report(self, attributes=None, patient=None):
+        """RegimenReport for the current drugs (same shape as check_regimen())."""
+        attributes = get_attributes() if attributes is None else attributes
+        drugs, names, results = self.drugs, self.names, self.results
+        flags = []
+        pairs = []
+        for i, drug in enumerate(drugs):
+            for kind, level, message in drug_flags(attributes.get(names[i]), patient):
+                flags.append((drug, kind, level, message))
+            for j in range(i + 1, len(drugs)):
+                pairs.append((drug, drugs[j], results.get(pair_key(names[i], names[j]))))
+        return RegimenReport(list(drugs), pairs, flags)
@@ -0,0 +1,33 @@
+import csv
+import io
+
+import calculators
+import cohort_scores
+
+
+def _write_patients(path, n):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["patient_id", "creatinine", "age", "sex"])
+        for i in range(n):
+            writer.writerow([f"P{i}", f"{0.6 + (i % 10) / 10:.1f}", 40 + i % 50, "Female" if i % 2 else "Male"])
+
+
+def test_defaulted_calculators_keep_every_row(tmp_path):
+    # HAS-BLED has no column in this CSV and runs on its defaults alone
+    source = tmp_path / "patients.csv"
+    _write_patients(source, 25)
+    out = io.StringIO()
+    rows = cohort_scores.stream_scores(
+        source, out, ("eGFR", "HAS-BLED"), keep=("patient_id",), workers=1, batch_lines=10,
+    )
+    result = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert rows == 25
+    assert len(result) == 25
+    assert [row["patient_id"] for row in result] == [f"P{i}" for i in range(25)]
+    for i, row in enumerate(result):
+        expected, _ = calculators.calculate(
+            "eGFR", {"creatinine": f"{0.6 + (i % 10) / 10:.1f}", "age": 40 + i % 50, "sex": "Female" if i % 2 else "Male"},
+        )
+        assert row["eGFR"] == cohort_scores._cell(expected["egfr"])
+        assert row["HAS-BLED"] == "0"
@@ -0,0 +1,34 @@
+import random
+
+import ddi_bitset
+from ddi_index import SEVERITY_LEVELS, InteractionIndex, severity_rank
+
+
+def _random_ddi(rng, n):
+    drugs = [f"Drug{i}" for i in range(n)]
+    data = {}
+    for i, a in enumerate(drugs):
+        for b in drugs[i + 1:]:
+            if rng.random() < 0.3:
+                severity = rng.choice(list(SEVERITY_LEVELS))
+                data.setdefault(a, {})[b] = {"type": "Pharmacodynamic", "severity": severity, "description": f"{a} + {b}"}
+    return drugs, data
+
+
+def test_max_severity_matches_pairwise_lookup():
+    rng = random.Random(17)
+    drugs, data = _random_ddi(rng, 40)
+    store = InteractionIndex(data)
+    bitsets = ddi_bitset.SeverityBitsets(store)
+    for _ in range(500):
+        # Duplicates and unknown drugs included
+        regimen = rng.sample(drugs, rng.randint(0, 8)) + rng.choice([[], ["Unknown"], [drugs[0], drugs[0]]])
+        records = store.interactions_among(regimen).values()
+        expected = max((severity_rank(r["severity"]) for r in records), default=0)
+        assert bitsets.max_severity(regimen) == expected
+        counts = {}
+        for r in records:
+            rank = severity_rank(r["severity"])
+            if rank:
+                counts[rank] = counts.get(rank, 0) + 1
+        assert bitsets.counts(regimen) == counts
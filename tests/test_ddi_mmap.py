@@ -0,0 +1,34 @@
+import ddi_mmap
+from ddi_compact import CompactInteractionIndex
+from ddi_index import InteractionIndex
+
+DDI = {
+    "Warfarin": {
+        "Aspirin": {"type": "Pharmacodynamic", "severity": "serious - use alternative", "description": "Warfarin and Aspirin both increase bleeding."},
+        "Paracetamol": {"type": None, "severity": "monitor closely", "description": "Paracetamol increases effects of Warfarin."},
+    },
+    "Aspirin": {
+        "Ibuprofen": {"type": "Pharmacodynamic", "severity": "no interaction", "description": "NO Potential interaction between Aspirin and Ibuprofen."},
+    },
+    "Ibuprofen": {
+        "Warfarin": {"type": "Pharmacokinetic", "severity": "contraindicated", "description": "Ibuprofen increases levels of Warfarin."},
+    },
+}
+
+
+def test_write_read_round_trip(tmp_path):
+    path = str(tmp_path / "ddi.idx")
+    ddi_mmap.compile_index(DDI, path)
+    index = ddi_mmap.MmapInteractionIndex(path)
+    expected = InteractionIndex(DDI)
+    assert index.drugs == expected.drugs
+    assert len(index) == len(expected) == len(CompactInteractionIndex(DDI))
+    for a in expected.drugs:
+        for b in expected.drugs:
+            record = expected.get(a, b)
+            assert index.get(a.upper(), b) == (None if record is None else dict(record))
+    assert index.interactions_among(["warfarin", "ibuprofen", "unknown"]) == {
+        ("ibuprofen", "warfarin"): dict(expected.get("ibuprofen", "warfarin")),
+    }
+    assert index.get("Warfarin", "Paracetamol")["type"] is None
+    assert "aspirin" in index and "unknown" not in index
@@ -0,0 +1,39 @@
+from ddi_index import InteractionIndex
+from ddi_overlay import LayeredInteractionStore, Overlay
+
+BASE = {
+    "Warfarin": {
+        "Aspirin": {"type": "Pharmacodynamic", "severity": "serious - use alternative", "description": "Bleeding risk."},
+        "Paracetamol": {"type": "Pharmacodynamic", "severity": "monitor closely", "description": "INR may rise."},
+        "Sildenafil": {"type": "Pharmacodynamic", "severity": "moderate", "description": "Base record."},
+    },
+}
+
+
+def test_hide_and_override():
+    base = InteractionIndex(BASE)
+    override = {"type": "Pharmacokinetic", "severity": "contraindicated", "description": "Local policy."}
+    store = LayeredInteractionStore(base, Overlay({
+        "hide_drugs": ["Sildenafil"],
+        "interactions": {"Paracetamol": {"Warfarin": override}, "Aspirin": {"Warfarin": None}},
+    }))
+    assert "sildenafil" not in store and "sildenafil" not in store.drugs
+    assert store.get("Warfarin", "Sildenafil") is None
+    assert store.get("Warfarin", "Aspirin") is None
+    assert dict(store.get("warfarin", "paracetamol")) == override
+    assert {key: dict(r) for key, r in store.interactions_among(["Aspirin", "Paracetamol", "Sildenafil", "Warfarin"]).items()} == {
+        ("paracetamol", "warfarin"): override,
+    }
+    # The shared base is untouched
+    assert base.get("Warfarin", "Aspirin")["severity"] == "serious - use alternative"
+    assert "sildenafil" in base
+
+
+def test_formulary_and_added_drugs():
+    store = LayeredInteractionStore(InteractionIndex(BASE), Overlay({
+        "formulary": ["Warfarin", "Aspirin", "Metronidazole"],
+        "interactions": {"Metronidazole": {"Warfarin": {"type": None, "severity": "serious - use alternative", "description": "Added."}}},
+    }))
+    assert store.drugs == ("aspirin", "metronidazole", "warfarin")
+    assert store.get("Warfarin", "Paracetamol") is None
+    assert store.get("Warfarin", "Metronidazole")["description"] == "Added."
@@ -0,0 +1,29 @@
+from ddi_index import InteractionIndex, merge_record
+
+
+def _record(severity, description):
+    return {"type": "Pharmacodynamic", "severity": severity, "description": description}
+
+
+def test_most_severe_wins_either_order():
+    mild, severe = _record("moderate", "Mild."), _record("contraindicated", "Severe.")
+    assert merge_record(mild, severe) is severe
+    assert merge_record(severe, mild) is severe
+    assert merge_record(None, mild) is mild
+
+
+def test_equal_severity_joins_distinct_descriptions():
+    a, b = _record("monitor closely", "First."), _record("Monitor Closely", "Second.")
+    assert merge_record(a, b)["description"] == "First. ALSO. Second."
+    assert merge_record(a, _record("monitor closely", "First.")) is a
+    assert merge_record(a, _record("monitor closely", "")) is a
+    assert merge_record(_record("monitor closely", None), b) is b
+
+
+def test_index_merges_both_directions():
+    index = InteractionIndex({
+        "Warfarin": {"Aspirin": _record("moderate", "One way.")},
+        "Aspirin": {"Warfarin": _record("serious - use alternative", "Other way.")},
+    })
+    assert len(index) == 1
+    assert index.get("warfarin", "aspirin")["description"] == "Other way."
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from regimen import ReportCache
+
+
+def test_concurrent_requests_compute_once():
+    cache = ReportCache(maxsize=4)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {("a", "b"): "record"}
+
+    results = []
+    key = frozenset({"a", "b"})
+    owner = threading.Thread(target=lambda: results.append(cache.get_or_compute(key, compute)))
+    owner.start()
+    assert started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(cache.get_or_compute(key, compute))) for _ in range(3)]
+    for t in waiters:
+        t.start()
+    while cache.stats()["coalesced"] < 3:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in [owner] + waiters:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 4 and all(r is results[0] for r in results)
+    assert dict(results[0]) == {("a", "b"): "record"}
+    assert cache.get_or_compute(key, compute) is results[0]
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 3, 1)
+
+
+def test_least_recently_used_is_evicted():
+    cache = ReportCache(maxsize=2)
+    for name in "abc":
+        cache.get_or_compute(frozenset(name), lambda: {})
+        if name == "b":
+            # Touch "a" so "b" is the least recently used
+            cache.get_or_compute(frozenset("a"), lambda: pytest.fail("cached"))
+    assert cache.stats()["evictions"] == 1
+    cache.get_or_compute(frozenset("a"), lambda: pytest.fail("a was evicted"))
+    computed = []
+    cache.get_or_compute(frozenset("b"), lambda: computed.append(1) or {})
+    assert computed == [1]
+
+
+def test_failed_compute_is_not_cached():
+    cache = ReportCache(maxsize=2)
+
+    def fail():
+        raise RuntimeError("store down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute(frozenset("a"), fail)
+    assert dict(cache.get_or_compute(frozenset("a"), lambda: {"k": 1})) == {"k": 1}